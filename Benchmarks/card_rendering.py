@@ -0,0 +1,83 @@
+# Cards per second for the gesture library thumbnails: a matplotlib Figure + FigureCanvasTkAgg
+# per card (the old path) against Tk canvas polylines drawn by Sparkline.draw_sparkline.
+# Both draw the same cached 200 point min/max envelope of an 8 channel recording.
+# Run from the repository root: python Benchmarks/card_rendering.py [cards]
+# Needs a display; without one only the off-screen work (Agg rendering vs coordinates) is timed.
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from Downsample import minmax_envelope
+from Sparkline import sparkline_coords, draw_sparkline
+
+WIDTH, HEIGHT = 250, 150
+
+def figure_card(master, low, high):
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(2.5, 1.5))
+    ax = fig.add_subplot(111)
+    trace = np.empty((low.shape[0] * 2, low.shape[1]))
+    trace[0::2], trace[1::2] = low, high
+    ax.plot(trace, linewidth=1)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    canvas = FigureCanvasTkAgg(fig, master=master)
+    canvas.draw()
+    canvas.get_tk_widget().pack()
+
+def sparkline_card(master, low, high):
+    import tkinter as tk
+    canvas = tk.Canvas(master, width=WIDTH, height=HEIGHT, bg="white", highlightthickness=0)
+    draw_sparkline(canvas, low, high, WIDTH, HEIGHT)
+    canvas.pack()
+
+def figure_offscreen(low, high):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(2.5, 1.5))
+    ax = fig.add_subplot(111)
+    trace = np.empty((low.shape[0] * 2, low.shape[1]))
+    trace[0::2], trace[1::2] = low, high
+    ax.plot(trace, linewidth=1)
+    FigureCanvasAgg(fig).draw()
+
+def cards_per_second(make_card, envelopes, root=None):
+    start = time.perf_counter()
+    for low, high in envelopes:
+        if root is None:
+            make_card(low, high)
+        else:
+            import tkinter as tk
+            frame = tk.Frame(root)
+            make_card(frame, low, high)
+            root.update()
+            frame.destroy()
+    return len(envelopes) / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    cards = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rng = np.random.default_rng(0)
+    envelopes = [minmax_envelope(rng.normal(size=(1000, 8)) * 20, 200) for _ in range(cards)]
+
+    root = None
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"No display ({e}); timing off-screen rendering only")
+
+    if root is not None:
+        figure_rate = cards_per_second(figure_card, envelopes, root)
+        sparkline_rate = cards_per_second(sparkline_card, envelopes, root)
+        root.destroy()
+        print(f"{'FigureCanvasTkAgg':<20} {figure_rate:>10.1f} cards/s")
+        print(f"{'Tk canvas sparkline':<20} {sparkline_rate:>10.1f} cards/s")
+    else:
+        figure_rate = cards_per_second(figure_offscreen, envelopes)
+        sparkline_rate = cards_per_second(lambda low, high: sparkline_coords(low, high, WIDTH, HEIGHT), envelopes)
+        print(f"{'Figure + Agg draw':<20} {figure_rate:>10.1f} cards/s")
+        print(f"{'sparkline coords':<20} {sparkline_rate:>10.1f} cards/s")
+    print(f"speedup: {sparkline_rate / figure_rate:.1f}x")
@@ -0,0 +1,42 @@
+# Cost of decoding one classifier decision, and its size on the wire: the text packet the
+# games used to parse inline (decode to str, split twice, float() both fields), the same
+# text through Games.controls, and the binary packet, which also carries a sequence
+# number and send time.
+# Run from the repository root: python Benchmarks/control_protocol.py [packets]
+import os
+import sys
+import time
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from Games.controls import encode_packet, decode_packet
+
+def inline_text(data):
+    """What every game did per frame before Games.controls."""
+    data = str(data.decode("utf-8"))
+    input_class = float(data.split(' ')[0])
+    velocity = float(data.split(' ')[1])
+    return input_class, velocity
+
+def inline_text_stamped(data):
+    """The same text approach carrying what the binary packet does, for a like-for-like size."""
+    fields = str(data.decode("utf-8")).split(' ')
+    return float(fields[0]), float(fields[1]), int(fields[2]), float(fields[3])
+
+if __name__ == "__main__":
+    packets = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    # libemg writes str() of a numpy float, so the text velocity has full precision
+    velocity = 0.7234817290354
+    timestamp = time.time()
+    text = bytes(f"3 {velocity}\n", 'utf-8')
+    stamped = bytes(f"3 {velocity} 123456 {timestamp}\n", 'utf-8')
+    binary = encode_packet(3, velocity, 123456, timestamp)
+    assert decode_packet(text) == (3, velocity, None, None)
+    input_class, decoded_velocity, seq, decoded_timestamp = decode_packet(binary)
+    assert (input_class, seq, decoded_timestamp) == (3, 123456, timestamp) and abs(decoded_velocity - velocity) < 1e-6
+    for name, fn, data in [('text, inline split (before)', inline_text, text),
+                           ('text + seq/time, inline split', inline_text_stamped, stamped),
+                           ('text, decode_packet', decode_packet, text),
+                           ('binary, decode_packet (after)', decode_packet, binary)]:
+        seconds = min(timeit.repeat(lambda: fn(data), number=packets, repeat=5))
+        print(f"{name:<30} {seconds / packets * 1e9:>7.0f} ns/packet, {len(data):>3} bytes")
@@ -0,0 +1,77 @@
+# Staleness of the classifier decisions the games act on, when the classifier sends faster
+# than the game draws. A local UDP sender stands in for the classifier, and a game loop
+# running at a fixed frame rate reads either one datagram per frame (how every game used
+# to read) or everything pending through Games.controls.ControlReceiver. Each packet's
+# class field carries its sequence number, so the loop can tell how old the decision it
+# acted on was. The drained receiver must stay within a few frames of real time.
+# Run from the repository root: python Benchmarks/control_staleness.py [producer_hz] [fps] [seconds]
+import os
+import sys
+import time
+import socket
+import threading
+import statistics
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from Games.controls import ControlReceiver, parse_decision
+
+def send(address, rate, seconds, sent):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    start = time.perf_counter()
+    seq = 0
+    while time.perf_counter() - start < seconds:
+        sent.append(time.perf_counter())
+        sock.sendto(bytes(f"{seq} 1.0\n", 'utf-8'), address)
+        seq += 1
+        # Sleep to the next send slot, so the rate holds on average
+        time.sleep(max(0, start + seq / rate - time.perf_counter()))
+    sock.close()
+
+def one_per_frame(receiver):
+    """The old loop: at most one datagram per frame."""
+    try:
+        return parse_decision(receiver.sock.recv(1024))
+    except BlockingIOError:
+        return None
+
+def drain(receiver):
+    return receiver.poll()
+
+def run(read, rate, fps, seconds):
+    receiver = ControlReceiver(('127.0.0.1', 0))
+    sent = []
+    sender = threading.Thread(target=send, args=(receiver.sock.getsockname(), rate, seconds, sent))
+    sender.start()
+    staleness = []
+    used = 0
+    current = None
+    start = time.perf_counter()
+    frame = 0
+    while sender.is_alive():
+        decision = read(receiver)
+        if decision is not None:
+            current = decision[0]
+            used += 1
+        if current is not None:
+            staleness.append(time.perf_counter() - sent[current])
+        frame += 1
+        time.sleep(max(0, start + frame / fps - time.perf_counter()))
+    sender.join()
+    receiver.close()
+    return {'staleness': staleness, 'sent': len(sent), 'used': used,
+            'behind': len(sent) - 1 - (current if current is not None else -1)}
+
+if __name__ == "__main__":
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else 200
+    fps = float(sys.argv[2]) if len(sys.argv) > 2 else 60
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 3
+    print(f"producer {rate:.0f} Hz, game {fps:.0f} fps, {seconds:.0f} s")
+    results = {}
+    for name, read in [('one per frame (before)', one_per_frame), ('drain (after)', drain)]:
+        result = results[name] = run(read, rate, fps, seconds)
+        staleness = result['staleness']
+        print(f"{name:<24} staleness mean {statistics.mean(staleness) * 1000:>7.1f} ms, "
+              f"last {staleness[-1] * 1000:>7.1f} ms, {result['used']}/{result['sent']} packets acted on, "
+              f"{result['behind']} behind at the end")
+    # Draining keeps the decision in use no older than a couple of frames
+    assert results['drain (after)']['staleness'][-1] < 3 / fps
@@ -0,0 +1,66 @@
+# Checks that LDA built from incremental sufficient statistics matches a batch sklearn fit.
+# Recordings are folded in, some are removed and replaced, and the result is compared with
+# LinearDiscriminantAnalysis().fit on the windows that remain, for 5 classes and for 2.
+# Run from the repository root: python Benchmarks/incremental_lda.py
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
+from Training import LDAStatistics
+
+NUM_FEATURES = 8
+
+def synthetic_recordings(class_names, reps, rng):
+    """Per-recording feature matrices: class-dependent means, a shared correlated covariance and rep-to-rep drift."""
+    mixing = rng.normal(size=(NUM_FEATURES, NUM_FEATURES))
+    centres = {c: rng.normal(scale=3, size=NUM_FEATURES) for c in class_names}
+    recordings = {}
+    for c in class_names:
+        for rep in range(reps):
+            windows = rng.integers(150, 250)
+            drift = rng.normal(scale=0.3, size=NUM_FEATURES)
+            recordings[f"{c}_{rep}"] = (c, centres[c] + drift + rng.normal(size=(windows, NUM_FEATURES)) @ mixing)
+    return recordings
+
+def batch_fit(recordings, class_names):
+    X = np.vstack([f for c, f in recordings.values()])
+    y = np.concatenate([np.full(f.shape[0], class_names.index(c)) for c, f in recordings.values()])
+    start = time.perf_counter()
+    lda = LinearDiscriminantAnalysis().fit(X, y)
+    return lda, X, time.perf_counter() - start
+
+def check(class_names, rng):
+    recordings = synthetic_recordings(class_names, 6, rng)
+    statistics = LDAStatistics()
+    for key, (c, features) in recordings.items():
+        statistics.add(key, c, features)
+
+    # Drop some recordings and fold in new ones without touching the rest
+    for key in list(recordings)[::4]:
+        statistics.remove(key)
+        del recordings[key]
+    for key, (c, features) in synthetic_recordings(class_names, 2, rng).items():
+        recordings["new_" + key] = (c, features)
+        statistics.add("new_" + key, c, features)
+
+    start = time.perf_counter()
+    incremental = statistics.fit(class_names)
+    incremental_time = time.perf_counter() - start
+    batch, X, batch_time = batch_fit(recordings, class_names)
+
+    assert np.array_equal(incremental.classes_, batch.classes_)
+    assert np.allclose(incremental.coef_, batch.coef_, rtol=1e-6, atol=1e-8), np.abs(incremental.coef_ - batch.coef_).max()
+    assert np.allclose(incremental.intercept_, batch.intercept_, rtol=1e-6, atol=1e-8)
+    assert np.allclose(incremental.predict_proba(X), batch.predict_proba(X), atol=1e-8)
+    assert np.array_equal(incremental.predict(X), batch.predict(X))
+    print(f"{len(class_names)} classes, {X.shape[0]} windows: max |coef diff| {np.abs(incremental.coef_ - batch.coef_).max():.2e}, "
+          f"fit from statistics {incremental_time * 1000:.2f} ms vs batch {batch_time * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    check(["Rest", "Close", "Open", "Pronation", "Supination"], rng)
+    check(["Rest", "Close"], rng)
+    print("incremental LDA matches the batch fit")
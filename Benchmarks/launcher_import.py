@@ -0,0 +1,49 @@
+# Cold-start cost of the Games launcher: importing GameViewer now, against what it used to
+# do at import and construction time (import all five game modules and build SnakeGame,
+# OneDFitts and FittsLawTest). Each run is a fresh interpreter. libemg (which itself pulls in
+# pygame, sklearn and scipy) is imported before the clock starts, as Main has already
+# loaded it by the time the launcher opens; the numbers are the launcher's own cost.
+# Run from the repository root: python Benchmarks/launcher_import.py [runs]
+import os
+import sys
+import json
+import subprocess
+import statistics
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PROBE = """
+import sys, time, json
+import libemg
+start = time.perf_counter()
+{code}
+print(json.dumps({{'seconds': time.perf_counter() - start, 'games': sorted(m for m in sys.modules if m.startswith('Games.'))}}))
+"""
+
+EAGER = """
+import GameViewer
+from Games.emg_hero import start_game as start_emg_hero
+from Games.snake import SnakeGame
+from Games.penguins.main import start_game as start_penguins
+from Games.OneDFitts import OneDFitts
+from Games.ISOFitts import FittsLawTest
+SnakeGame(), OneDFitts(), FittsLawTest()
+"""
+
+LAZY = """
+import GameViewer
+"""
+
+def measure(code):
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    output = subprocess.run([sys.executable, '-c', PROBE.format(code=code)], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    measure(EAGER) # warm the OS file cache so both paths read from memory
+    for name, code in [('eager (before)', EAGER), ('lazy (after)', LAZY)]:
+        results = [measure(code) for _ in range(runs)]
+        median = statistics.median(r['seconds'] for r in results)
+        print(f"{name:<16} {median * 1000:>8.1f} ms median of {runs}, game modules imported: {len(results[0]['games'])}")
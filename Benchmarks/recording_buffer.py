@@ -0,0 +1,47 @@
+# Compares the old np.vstack-per-tick recording path against RecordingBuffer.
+# Run from the repository root: python Benchmarks/recording_buffer.py
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from Recorder import RecordingBuffer
+
+SAMPLE_RATE = 200
+NUM_CHANNELS = 8
+TICK = 0.1 # DataCollectionApp polls every 100 ms
+
+def vstack_path(chunks):
+    data = []
+    for chunk in chunks:
+        if len(data) == 0:
+            data = chunk
+        else:
+            data = np.vstack([data, chunk])
+    return data
+
+def buffer_path(chunks, duration):
+    data = RecordingBuffer(SAMPLE_RATE, duration)
+    for chunk in chunks:
+        data.append(chunk)
+    return data.get_data()
+
+def time_it(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+if __name__ == "__main__":
+    print(f"{'length':>8} {'vstack (s)':>12} {'buffer (s)':>12} {'speedup':>8}")
+    for duration in [5, 60, 600]:
+        per_tick = int(SAMPLE_RATE * TICK)
+        chunks = [np.random.randint(-128, 127, (per_tick, NUM_CHANNELS)).astype(np.float64) for _ in range(int(duration / TICK))]
+        assert np.array_equal(vstack_path(chunks), buffer_path(chunks, duration))
+        repeats = 5 if duration < 600 else 1
+        t_vstack = time_it(lambda: vstack_path(chunks), repeats)
+        t_buffer = time_it(lambda: buffer_path(chunks, duration), repeats)
+        print(f"{str(duration) + ' s':>8} {t_vstack:>12.4f} {t_buffer:>12.4f} {t_vstack / t_buffer:>7.1f}x")
@@ -0,0 +1,68 @@
+# Compares recording storage backends on synthetic 8 channel, 200 Hz EMG:
+# the original np.savetxt CSV, raw float32 .npy, and zlib / lzma compressed .emgz.
+# Run from the repository root: python Benchmarks/recording_storage.py [minutes]
+import os
+import sys
+import time
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from RecordingIO import RecordingWriter, CompressedRecordingWriter, load_recording
+
+SAMPLE_RATE = 200
+NUM_CHANNELS = 8
+CHUNK = 4 # samples per acquisition poll at 20 ms
+
+def synthetic_emg(seconds, seed=0):
+    """Myo-like int8 EMG: noise whose amplitude follows slow contraction bursts."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    envelope = 5 + 40 * (np.sin(np.arange(n) / SAMPLE_RATE * 2 * np.pi / 8) > 0)
+    gains = rng.uniform(0.5, 1.5, NUM_CHANNELS)
+    data = rng.normal(size=(n, NUM_CHANNELS)) * envelope[:, None] * gains
+    return np.clip(np.round(data), -128, 127).astype(np.float32)
+
+def write_csv(path, data):
+    np.savetxt(path, data, delimiter=",")
+
+def read_csv(path):
+    return np.loadtxt(path, delimiter=",")
+
+def write_stream(writer, data):
+    for start in range(0, data.shape[0], CHUNK):
+        writer.append(data[start:start + CHUNK])
+    writer.close()
+
+def read_binary(path):
+    return np.array(load_recording(path))
+
+if __name__ == "__main__":
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    data = synthetic_emg(minutes * 60)
+    raw_mb = data.nbytes / 1e6
+    folder = tempfile.mkdtemp()
+    backends = [
+        ('csv (savetxt)', 'rec.csv', lambda p: write_csv(p, data), read_csv),
+        ('npy float32', 'rec.npy', lambda p: write_stream(RecordingWriter(p), data), read_binary),
+        ('emgz zlib', 'rec_zlib.emgz', lambda p: write_stream(CompressedRecordingWriter(p, 'zlib'), data), read_binary),
+        ('emgz lzma', 'rec_lzma.emgz', lambda p: write_stream(CompressedRecordingWriter(p, 'lzma'), data), read_binary),
+    ]
+
+    print(f"{minutes:g} min, {NUM_CHANNELS} channels @ {SAMPLE_RATE} Hz ({data.shape[0]} samples, {raw_mb:.2f} MB as float32)")
+    print(f"{'backend':<15} {'size (KB)':>10} {'vs csv':>8} {'write MB/s':>11} {'read MB/s':>10}")
+    csv_size = None
+    for name, filename, write, read in backends:
+        path = os.path.join(folder, filename)
+        start = time.perf_counter()
+        write(path)
+        write_time = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = read(path)
+        read_time = time.perf_counter() - start
+        assert np.array_equal(loaded, data), name
+        size = os.path.getsize(path)
+        csv_size = csv_size or size
+        print(f"{name:<15} {size / 1e3:>10.1f} {csv_size / size:>7.1f}x {raw_mb / write_time:>11.1f} {raw_mb / read_time:>10.1f}")
+        os.remove(path)
+    os.rmdir(folder)
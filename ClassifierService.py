@@ -0,0 +1,137 @@
+import os
+import time
+import pickle
+import numpy as np
+import libemg
+from multiprocessing import Lock
+from multiprocessing.shared_memory import SharedMemory
+from libemg.shared_memory_manager import SharedMemoryManager
+import Training
+from Games.controls import encode_packet, parse_decision
+
+class BinarySender:
+    """Stands in for the classifier's UDP socket and re-sends each text decision as a binary packet."""
+    def __init__(self, sock):
+        self.sock = sock
+        self.seq = 0
+
+    def sendto(self, message, address):
+        decision = parse_decision(message)
+        if decision is None:
+            return
+        self.sock.sendto(encode_packet(decision[0], decision[1], self.seq, time.time()), address)
+        self.seq += 1
+
+class BinaryOnlineEMGClassifier(libemg.emg_predictor.OnlineEMGClassifier):
+    """OnlineEMGClassifier that sends the Games.controls binary packet instead of "class velocity" text.
+
+    libemg builds the text message at the end of write_output, so the socket is wrapped
+    rather than the prediction code copied; the sequence number counts up from 0 in the
+    predictor process.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sock = BinarySender(self.sock)
+
+class ClassifierService:
+    """The application's one online classifier, streaming decisions to the games over UDP.
+
+    start() launches the predictor process the first time and hot-swaps the model after
+    that: the new model is pickled to <folder>/mdl<n>.pkl and its number written to the
+    shared "adapt_flag", which libemg's prediction loop checks before every window and
+    loads in place. The process, its socket and its data handler connection therefore
+    outlive every game and screen change, and only stop() ends them.
+
+    Decisions go out as binary packets (see Games.controls); binary=False sends libemg's
+    "class velocity" text instead, which the games still read.
+    """
+    def __init__(self, odh, folder=os.path.join('Data', '.cache', 'online'), binary=True):
+        self.odh = odh
+        self.binary = binary
+        self.folder = os.path.join(folder, '')
+        self.classifier = None
+        self.model = None
+        self.input_size = None
+        self.smm = None
+        self.swaps = 0
+
+    @property
+    def running(self):
+        return self.classifier is not None and self.classifier.process.is_alive()
+
+    def start(self, model):
+        """Starts classifying with `model` (as returned by Training.load_or_train), swapping it in if already running."""
+        fingerprint = model.get('fingerprint')
+        if self.running and fingerprint is not None and self.model.get('fingerprint') == fingerprint:
+            # Same recordings, same model: keep streaming without touching the predictor
+            self.model = model
+            return
+        input_size = sum(f.shape[1] for f in model['training_features'].values())
+        if self.running and input_size == self.input_size and self.swap(model):
+            return
+        self.stop()
+        # Own locks for every shared variable, so this process can signal the predictor through them
+        self.smm_items = [
+            ["classifier_output", (100, 4), np.double, Lock()],
+            ["classifier_input", (100, 1 + input_size), np.double, Lock()],
+            ["adapt_flag", (1, 1), np.int32, Lock()],
+            ["active_flag", (1, 1), np.int8, Lock()],
+        ]
+        online_classifier = BinaryOnlineEMGClassifier if self.binary else libemg.emg_predictor.OnlineEMGClassifier
+        self.classifier = online_classifier(model['classifier'], Training.WINDOW_SIZE, Training.WINDOW_INCREMENT,
+                                            self.odh, Training.FEATURES, file_path=self.folder, smm=True,
+                                            smm_items=self.smm_items, std_out=False)
+        self.classifier.run(block=False)
+        self.model = model
+        self.input_size = input_size
+
+    def restart(self):
+        """Starts the predictor afresh with the current model.
+
+        The predictor only classifies once the handler's running sample count passes the
+        one it expects next, so after anything resets the handler (libemg's feature-space
+        view does) it would sit silent until the count caught up again.
+        """
+        model = self.model
+        if model is not None:
+            self.stop()
+            self.start(model)
+
+    def swap(self, model):
+        """Hands a new model to the running predictor; returns False if it cannot be reached yet."""
+        if self.smm is None:
+            smm = SharedMemoryManager()
+            if not smm.find_variable(*self.smm_items[2]):
+                # The predictor process has not created its shared variables yet
+                return False
+            self.smm = smm
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+        # Alternate between two files so the next swap does not overwrite a model still being loaded
+        number = self.swaps % 2
+        with open(self.folder + f'mdl{number}.pkl', 'wb') as f:
+            pickle.dump(model['classifier'], f)
+        self.smm.modify_variable("adapt_flag", lambda x: number)
+        self.swaps += 1
+        self.model = model
+        return True
+
+    def stop(self):
+        if self.smm is not None:
+            self.smm.cleanup(parent=False)
+            self.smm = None
+        if self.classifier is not None:
+            self.classifier.stop_running()
+            self.classifier.process.join()
+            self.classifier = None
+            # The terminated predictor never releases its shared variables. Left behind, they
+            # would be attached to, at their old size, by the next predictor
+            for tag, *_ in self.smm_items:
+                try:
+                    segment = SharedMemory(tag)
+                except FileNotFoundError:
+                    continue
+                segment.close()
+                segment.unlink()
+        self.model = None
+        self.input_size = None
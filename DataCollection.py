@@ -3,28 +3,41 @@ from tkinter import ttk
 from tkinter import Canvas
 from PIL import Image, ImageTk
 import time
-import numpy as np
 import os 
 import matplotlib.pyplot as plt 
+from Recorder import RecordingBuffer, ChunkedBuffer, AcquisitionThread, SignalQuality
+from RecordingIO import RotatingRecordingWriter, BackgroundWriter, create_writer, recording_extension
+from Previews import PreviewCache
+from Downsample import decimate, stack_channels
+from Protocol import ProtocolRunner
+
+PLOT_WIDTH = 2000 # pixel columns traces are decimated to before plotting
 
 class DataCollectionApp:
-    def __init__(self, root, odh):
+    def __init__(self, root, odh, catalog, sample_rate):
         self.root = root
-        self.root.title("Data Collection")
-        self.root.geometry("400x500")
-        self.root.configure(bg="white")
-        self.root.attributes("-topmost", True)
-        self.root.focus_force()
-        self.root.protocol("WM_DELETE_WINDOW", self.on_closing) 
+        self.frame = tk.Frame(root, bg="white")
 
         self.odh = odh 
-        self.data = []
+        self.sample_rate = sample_rate # EMG rate of the device streaming into odh
+        self.data = None
+        self.writer = None
+        self.acquisition = None
+        self.quality = None
+        self.poll_interval = 0.02
+        self.saver = BackgroundWriter()
+        self.catalog = catalog
+        self.previews = PreviewCache('Data')
+        self.recording_gesture = None
+        self.recording_rep = None
+        self.recording_timestamp = None
+        self.saves_after_id = None
 
         self.gesture_var = tk.StringVar()
 
         # Add dropdown value label
         self.dropdown_label = tk.Label(
-            root, 
+            self.frame, 
             textvariable=self.gesture_var, 
             font=("Arial", 24, "bold"), 
             fg="#008000", 
@@ -33,12 +46,12 @@ class DataCollectionApp:
         self.dropdown_label.pack()
 
         # Create canvas for circular progress
-        self.canvas = Canvas(root, width=250, height=250, bg="white", highlightthickness=0)
+        self.canvas = Canvas(self.frame, width=250, height=250, bg="white", highlightthickness=0)
         self.canvas.pack(pady=0)
 
         # Add progress text label
         self.progress_label = tk.Label(
-            root, 
+            self.frame, 
             text="0%", 
             font=("Arial", 24, "bold"), 
             fg="#008000", 
@@ -46,11 +59,15 @@ class DataCollectionApp:
         )
         self.progress_label.pack()
 
+        # Live per-channel signal quality (RMS bars, red when clipping or flat-lined)
+        self.quality_canvas = Canvas(self.frame, width=250, height=50, bg="white", highlightthickness=0)
+        self.quality_canvas.pack()
+
         # Gesture selection dropdown
         self.gesture_var.set("Rest")  # Default value
         self.gesture_options = ["Rest", "Open", "Close", "Pronation", "Supination"]
 
-        self.gesture_dropdown = ttk.Combobox(root, textvariable=self.gesture_var)
+        self.gesture_dropdown = ttk.Combobox(self.frame, textvariable=self.gesture_var)
         self.gesture_dropdown['values'] = self.gesture_options
         self.gesture_dropdown['state'] = 'normal'
         self.gesture_dropdown.bind("<<ComboboxSelected>>", self.update_image)
@@ -67,10 +84,18 @@ class DataCollectionApp:
         self.recording = False
         self.after_id = None
         self.start_time = None
+        self.protocol = None
+        # (gesture, reps, hold time, rest time) steps for the scripted session
+        self.protocol_steps = [(gesture, 5, self.total_time, 3) for gesture in self.gesture_options]
+        # Free-form sessions are written to disk once a second and split into 5 minute files
+        self.session = None
+        self.session_start = None
+        self.session_chunk_samples = self.sample_rate
+        self.session_file_samples = self.sample_rate * 60 * 5
 
         # Record button
         self.record_button = tk.Button(
-            root, 
+            self.frame, 
             text="Record",
             command=self.toggle_recording,
             relief=tk.RAISED,
@@ -81,7 +106,43 @@ class DataCollectionApp:
         )
         self.record_button.pack(pady=10)
 
-        # self.checkbox_frame = tk.Frame(root, bg="white")
+        # Protocol button - records every gesture back to back without clicking through each rep
+        self.protocol_button = tk.Button(
+            self.frame, 
+            text="Run Protocol",
+            command=self.toggle_protocol,
+            relief=tk.RAISED,
+            bd=2,
+            padx=20,
+            pady=5,
+            font=("Arial", 10)
+        )
+        self.protocol_button.pack()
+
+        # Session button - records until stopped with constant memory use
+        self.session_button = tk.Button(
+            self.frame, 
+            text="Record Session",
+            command=self.toggle_session,
+            relief=tk.RAISED,
+            bd=2,
+            padx=20,
+            pady=5,
+            font=("Arial", 10)
+        )
+        self.session_button.pack(pady=(10, 0))
+
+        # Save status label - filled in asynchronously by the background writer
+        self.status_label = tk.Label(
+            self.frame,
+            text="",
+            font=("Arial", 10),
+            fg="#555555",
+            bg="white"
+        )
+        self.status_label.pack()
+
+        # self.checkbox_frame = tk.Frame(self.frame, bg="white")
         # self.checkbox_frame.pack(pady=(0, 10))
 
         # self.plot_var = tk.BooleanVar()
@@ -99,10 +160,27 @@ class DataCollectionApp:
         # Initialize the progress arc
         self.draw_progress(0)
 
-    def on_closing(self):
-        self.root.destroy()
-        from Main import main
-        main(self.odh)
+    def show(self):
+        self.root.title("Data Collection")
+        self.root.geometry("400x690")
+        # Pick up rep numbers of recordings made or deleted while this screen was hidden
+        self.catalog.refresh()
+        self.check_saves()
+
+    def hide(self):
+        """Stop whatever is being recorded when leaving the screen; finished saves carry on in the background"""
+        if self.protocol is not None:
+            self.protocol.stop()
+            self.protocol_finished()
+        if self.session is not None:
+            self.stop_session()
+        if self.recording:
+            self.toggle_recording()
+        self.root.after_cancel(self.saves_after_id)
+        self.saves_after_id = None
+
+    def close(self):
+        self.saver.close()
 
     def load_images(self):
         for gesture in self.gesture_options:
@@ -117,18 +195,130 @@ class DataCollectionApp:
         """Toggle between recording and stopped states"""
         if not self.recording:
             # Start recording
-            self.odh.reset()
-            self.data = []
+            self.data = RecordingBuffer(self.sample_rate, self.total_time)
+            self.writer = create_writer(self.next_recording_path(), timestamps=True)
+            self.quality = SignalQuality(self.sample_rate)
+            self.acquisition = AcquisitionThread(self.odh, self.data, self.on_chunk, self.poll_interval, self.quality)
+            self.acquisition.start()
             self.recording = True
             self.start_time = time.time()
             self.record_button.configure(text="Stop", bg="#ff4444", fg="white")
             self.update_progress()
         else:
-            # Stop recording
+            # Stop recording - an unfinished rep is not kept
             self.stop_recording()
+            self.saver.submit(self.writer.discard)
+            self.catalog.release_rep(self.recording_gesture, self.recording_rep)
+
+    def toggle_protocol(self):
+        """Start or cancel a scripted multi-gesture session"""
+        if self.protocol is None:
+            if self.recording or self.session is not None:
+                return
+            self.protocol = ProtocolRunner(self, self.protocol_steps)
+            self.record_button.configure(state=tk.DISABLED)
+            self.session_button.configure(state=tk.DISABLED)
+            self.gesture_dropdown.configure(state=tk.DISABLED)
+            self.protocol_button.configure(text="Stop Protocol", bg="#ff4444", fg="white")
+            self.protocol.start()
+        else:
+            self.protocol.stop()
+            self.protocol_finished()
+
+    def protocol_finished(self):
+        self.protocol = None
+        self.record_button.configure(state=tk.NORMAL)
+        self.session_button.configure(state=tk.NORMAL)
+        self.gesture_dropdown.configure(state='normal')
+        self.protocol_button.configure(text="Run Protocol", bg="SystemButtonFace", fg="black")
+        self.draw_progress(0)
+        self.progress_label.configure(text="0%")
+
+    def toggle_session(self):
+        """Start or stop a long free-form recording session"""
+        if self.session is None:
+            if self.recording or self.protocol is not None:
+                return
+            self.start_session()
+        else:
+            self.stop_session()
+
+    def start_session(self):
+        rep = self.catalog.next_rep("Session")
+        timestamp = time.time()
+        base_path = os.path.splitext(self.recording_path("Session", rep, timestamp))[0]
+
+        def part_closed(path, part, writer):
+            # Runs on the writer thread as each part file is finished, possibly after a new
+            # recording has replaced self.acquisition, so it reads this session's acquisition
+            self.catalog.add(path, "Session", rep, timestamp, writer.rows, writer.num_channels, self.sample_rate,
+                             part=part, quality=acquisition.snapshot()['quality'])
+            self.previews.update(path)
+
+        def chunk_acquired(samples, timestamp):
+            # Timestamps index the whole session, so they can be queued before the chunked samples
+            self.saver.submit(writer.mark, timestamp, acquisition.samples_pulled)
+
+        writer = RotatingRecordingWriter(lambda part: f"{base_path}_P_{part}{recording_extension()}", self.session_file_samples, part_closed, timestamps=True)
+        buffer = ChunkedBuffer(self.session_chunk_samples, lambda chunk: self.saver.submit(writer.append, chunk))
+        self.quality = SignalQuality(self.sample_rate)
+        acquisition = AcquisitionThread(self.odh, buffer, chunk_acquired, self.poll_interval, self.quality)
+        self.acquisition = acquisition
+        self.session = (writer, buffer)
+        self.session_start = time.time()
+        self.record_button.configure(state=tk.DISABLED)
+        self.protocol_button.configure(state=tk.DISABLED)
+        self.session_button.configure(text="Stop Session", bg="#ff4444", fg="white")
+        self.acquisition.start()
+        self.update_session()
+
+    def stop_session(self):
+        self.acquisition.stop()
+        writer, buffer = self.session
+        buffer.flush()
+        self.saver.submit(writer.close, notify="Session")
+        self.session = None
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+        self.record_button.configure(state=tk.NORMAL)
+        self.protocol_button.configure(state=tk.NORMAL)
+        self.session_button.configure(text="Record Session", bg="SystemButtonFace", fg="black")
+        self.draw_progress(0)
+        self.progress_label.configure(text="0%")
+
+    def update_session(self):
+        """Show elapsed session time - the arc goes round once a minute"""
+        elapsed = time.time() - self.session_start
+        self.draw_progress((elapsed % 60) / 60 * 100)
+        self.progress_label.configure(text=f"{int(elapsed // 60)}:{int(elapsed % 60):02d}")
+        snapshot = self.acquisition.snapshot()
+        self.status_label.configure(text=f"{snapshot['samples']} samples", fg="#555555")
+        self.draw_quality(snapshot['quality'])
+        self.after_id = self.root.after(100, self.update_session)
+
+    def on_chunk(self, samples, timestamp):
+        """Queue newly acquired samples for the disk writer (runs on the acquisition thread)"""
+        self.saver.submit(self.writer.append, samples, timestamp)
+
+    def recording_path(self, gesture, rep, timestamp):
+        return 'Data/C_' + gesture + "_R_" + str(rep) + '_T_' + str(timestamp) + recording_extension()
+
+    def next_recording_path(self):
+        self.recording_gesture = self.gesture_var.get()
+        self.recording_rep = self.catalog.next_rep(self.recording_gesture)
+        self.recording_timestamp = time.time()
+        return self.recording_path(self.recording_gesture, self.recording_rep, self.recording_timestamp)
+
+    def save_recording(self, writer, gesture, rep, timestamp, quality=None):
+        """Finish a recording file and add it to the catalog (runs on the writer thread)"""
+        path = writer.close()
+        self.catalog.add(path, gesture, rep, timestamp, writer.rows, writer.num_channels, self.sample_rate, quality=quality)
+        self.previews.update(path)
+        return path
 
     def stop_recording(self):
         """Stop the recording process"""
+        self.acquisition.stop()
         self.recording = False
         if self.after_id:
             self.root.after_cancel(self.after_id)
@@ -142,29 +332,44 @@ class DataCollectionApp:
         if self.recording:
             elapsed = time.time() - self.start_time
             progress = (elapsed / self.total_time) * 100
-            new_data, amount = self.odh.get_data()
-            if amount['emg'][0][0] > 0:
-                if len(self.data) == 0:
-                    self.data = new_data['emg'][:amount['emg'][0][0]]
-                else:
-                    self.data = np.vstack([self.data, new_data['emg'][:amount['emg'][0][0]]])
-            self.odh.reset()
             
             if progress >= 100:
-                if not os.path.exists('Data/'):
-                    os.makedirs('Data/')
-                reps = lambda d, k: sum(1 for f in os.listdir(d) if k in f and os.path.isfile(os.path.join(d, f)))
-                file_count = reps('Data', self.gesture_var.get()) 
-                reps = lambda d, k: sum(1 for f in os.listdir(d) if k in f and os.path.isfile(os.path.join(d, f)))
-                np.savetxt('Data/C_' + self.gesture_var.get() + "_R_" + str(file_count) + '_T_' + str(time.time()) + ".csv", self.data, delimiter=",")
                 self.stop_recording()
+                self.saver.submit(self.save_recording, self.writer, self.recording_gesture, self.recording_rep,
+                                  self.recording_timestamp, self.quality.summary(), notify=self.recording_gesture)
+                self.status_label.configure(text="Saving...")
                 # if self.plot_var.get():
-                #     self.plot_channels(self.data)
+                #     self.plot_channels(self.data.get_data())
             else:
                 self.draw_progress(progress)
                 self.progress_label.configure(text=f"{int(progress)}%")
+                snapshot = self.acquisition.snapshot()
+                self.status_label.configure(text=f"{snapshot['samples']} samples", fg="#555555")
+                self.draw_quality(snapshot['quality'])
                 self.after_id = self.root.after(100, self.update_progress)
 
+    def draw_quality(self, summary):
+        """Draws one RMS bar per channel, red if the channel clipped or flat-lined"""
+        self.quality_canvas.delete("all")
+        if summary is None:
+            return
+        num_channels = len(summary['rms'])
+        bar_width = 250 / num_channels
+        for i, rms in enumerate(summary['rms']):
+            height = min(1, rms / self.quality.clip_level) * 40
+            color = "#ff4444" if summary['flat'][i] or summary['clipped'][i] > 0 else "#008000"
+            self.quality_canvas.create_rectangle(i * bar_width + 4, 45 - height, (i + 1) * bar_width - 4, 45, fill=color, outline="")
+
+    def check_saves(self):
+        """Report recordings the background writer has finished saving"""
+        for gesture, path, error in self.saver.poll_completed():
+            if error is not None:
+                print("Error saving recording:", error)
+                self.status_label.configure(text="Save failed", fg="#ff4444")
+            else:
+                self.status_label.configure(text=f"Saved {gesture}", fg="#555555")
+        self.saves_after_id = self.root.after(100, self.check_saves)
+
     def draw_progress(self, percent):
         """Draws a clockwise circular progress arc with outline."""
         self.canvas.delete("all")
@@ -205,17 +410,10 @@ class DataCollectionApp:
             self.canvas.create_image(125, 125, image=self.images[current_gesture], tags="image")
 
     def plot_channels(self, data):
-        num_channels = data.shape[1]
-        inter_channel_amount = 1.5 * np.max(data)
-        for j in range(num_channels):
-            y_data = data[:, j]
-            plt.plot(y_data + inter_channel_amount * j)
+        x, y = decimate(data, PLOT_WIDTH)
+        stacked, offsets = stack_channels(y)
+        for j in range(stacked.shape[1]):
+            plt.plot(x, stacked[:, j])
         plt.xlabel('Time')
         plt.ylabel('EMG')
         plt.show()
-
-def collect_data(odh):
-    # odh = None 
-    root = tk.Tk()
-    app = DataCollectionApp(root, odh)
-    root.mainloop()
\ No newline at end of file
@@ -0,0 +1,95 @@
+import numpy as np
+
+def _as_2d(data):
+    data = np.asarray(data)
+    return data[:, None] if data.ndim == 1 else data
+
+def minmax_envelope(data, buckets):
+    """Splits a (samples x channels) recording into at most `buckets` equal runs and returns each run's (min, max)."""
+    data = _as_2d(data)
+    rows = data.shape[0]
+    if rows == 0:
+        empty = np.empty((0, data.shape[1]), dtype=np.float32)
+        return empty, empty
+    buckets = min(buckets, rows)
+    starts = np.linspace(0, rows, buckets + 1).astype(int)[:-1]
+    return (np.minimum.reduceat(data, starts, axis=0).astype(np.float32),
+            np.maximum.reduceat(data, starts, axis=0).astype(np.float32))
+
+def minmax(data, width):
+    """Min/max decimation to `width` pixels: returns (x, y) with two points per pixel column.
+
+    Every bucket contributes its min and its max at the bucket's first sample index, so
+    spikes survive however far the recording is reduced.
+    """
+    data = _as_2d(data)
+    rows = data.shape[0]
+    if rows <= 2 * width:
+        return np.arange(rows), data
+    low, high = minmax_envelope(data, width)
+    starts = np.linspace(0, rows, width + 1).astype(int)[:-1]
+    y = np.empty((width * 2, data.shape[1]), dtype=np.float32)
+    y[0::2] = low
+    y[1::2] = high
+    return np.repeat(starts, 2), y
+
+def lttb(data, threshold):
+    """Largest-Triangle-Three-Buckets decimation of every channel to `threshold` points.
+
+    Returns (x, y), both (threshold x channels): each channel keeps its own sample
+    indices. The loop runs once per bucket with all channels handled together, so the
+    cost is O(samples) in numpy plus O(threshold) in Python.
+    """
+    data = _as_2d(data).astype(np.float64, copy=False)
+    rows, channels = data.shape
+    if threshold >= rows or threshold < 3:
+        return np.tile(np.arange(rows)[:, None], (1, channels)), data
+    # The first and last samples are always kept; the rest is split into threshold - 2 buckets
+    edges = np.linspace(1, rows - 1, threshold - 1).astype(int)
+    cols = np.arange(channels)
+    x = np.empty((threshold, channels), dtype=int)
+    x[0] = 0
+    x[-1] = rows - 1
+    previous = np.zeros(channels, dtype=int)
+    for b in range(threshold - 2):
+        start, end = edges[b], edges[b + 1]
+        # Third corner: the mean of the next bucket (or the last sample)
+        if b + 2 < len(edges):
+            next_x = (end + edges[b + 2] - 1) / 2
+            next_y = data[end:edges[b + 2]].mean(axis=0)
+        else:
+            next_x = rows - 1
+            next_y = data[rows - 1]
+        prev_y = data[previous, cols]
+        xs = np.arange(start, end)[:, None]
+        area = np.abs((previous - next_x) * (data[start:end] - prev_y) - (previous - xs) * (next_y - prev_y))
+        previous = start + area.argmax(axis=0)
+        x[b + 1] = previous
+    return x, data[x, cols]
+
+def decimate(data, width, method='minmax'):
+    """Reduces a recording to roughly `width` pixels for plotting; returns (x, y) for ax.plot."""
+    if method == 'lttb':
+        return lttb(data, 2 * width)
+    return minmax(data, width)
+
+def channel_offsets(data, spacing=1.5, percentile=99):
+    """Vertical offsets for stacking channels in one plot, plus each channel's median.
+
+    Each channel's amplitude is a high percentile of its distance from its median, so a
+    single outlier cannot push the other traces apart. Neighbouring channels are spaced
+    by `spacing` times their mean amplitude.
+    """
+    data = _as_2d(data)
+    if data.shape[0] == 0:
+        return np.zeros(data.shape[1]), np.zeros(data.shape[1])
+    centre = np.median(data, axis=0)
+    amplitude = np.percentile(np.abs(data - centre), percentile, axis=0)
+    amplitude[amplitude == 0] = 1
+    gaps = spacing * (amplitude[:-1] + amplitude[1:]) / 2
+    return np.concatenate([[0], np.cumsum(gaps)]), centre
+
+def stack_channels(data, spacing=1.5, percentile=99):
+    """Centres every channel and shifts it by channel_offsets so the traces do not overlap."""
+    offsets, centre = channel_offsets(data, spacing, percentile)
+    return _as_2d(data) - centre + offsets, offsets
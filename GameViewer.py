@@ -1,38 +1,51 @@
-import libemg
+import queue
+import importlib
+import threading
 import tkinter as tk
 from PIL import Image, ImageTk
-from tkinter import Tk, Toplevel, Frame, Label, messagebox, PhotoImage, Canvas, Scrollbar
+import Training
+from tkinter import Toplevel, Frame, Label, messagebox, PhotoImage, Canvas, Scrollbar
 
-from Games.emg_hero import start_game as start_emg_hero
-from Games.snake import SnakeGame
-from Games.penguins.main import start_game as start_penguins
-from Games.OneDFitts import OneDFitts
-from Games.ISOFitts import FittsLawTest
+def lazy_game(module_name, start):
+    """Returns a launcher that imports the game's module, and builds the game, only when called.
+
+    Every game pulls in pygame and some reseed `random` in their constructors, so none of
+    that should happen just because the launcher was opened.
+    """
+    def launch():
+        return start(importlib.import_module(module_name))
+    return launch
 
 class GameViewer:
-    def __init__(self, root, odh):
+    def __init__(self, root, odh, classifier_service, catalog, sample_rate):
         # Initialize main window
         self.root = root
         self.odh = odh
-        self.root.title("Game Launcher")
-        self.root.geometry("800x600")
-        self.root.configure(bg="white")
-        self.root.attributes("-topmost", True)
-        self.root.focus_force()
-        self.root.protocol("WM_DELETE_WINDOW", self.on_closing) 
-
-        # Setup classifier 
-        self.set_up_classifier()
+        self.sample_rate = sample_rate
+        # The one online classifier, owned by Main so it keeps running across games and screens
+        self.classifier_service = classifier_service
+        self.catalog = catalog
+        self.frame = Frame(root, bg="white")
 
         # Add title
         self.title_label = tk.Label(
-            self.root,
+            self.frame,
             text="Games",
             font=("Helvetica", 24, "bold"),
             bg="white",
             fg="#333333"
         )
         self.title_label.pack(pady=(20, 5))
+
+        # Training status - games that need the classifier stay disabled until it is ready
+        self.status_label = tk.Label(
+            self.frame,
+            text="",
+            font=("Helvetica", 11),
+            bg="white",
+            fg="#555555"
+        )
+        self.status_label.pack(pady=(0, 5))
         
         # Setup UI frames and scrolling
         self.setup_ui_framework()
@@ -42,27 +55,27 @@ class GameViewer:
             'pacman': {
                 'title': 'Penguin Jumper',
                 'thumbnail': 'Icons/Penguin.png',
-                'module': start_penguins
+                'module': lazy_game('Games.penguins.main', lambda game: game.start_game())
             },
             'snake': {
                 'title': 'Snake',
                 'thumbnail': 'Icons/Snake.png',
-                'module': SnakeGame().run_game
+                'module': lazy_game('Games.snake', lambda game: game.SnakeGame().run_game())
             },
             'guitar_hero': {
                 'title': 'Guitar Hero',
                 'thumbnail': 'Icons/GuitarHero.png',
-                'module': start_emg_hero
+                'module': lazy_game('Games.emg_hero', lambda game: game.start_game())
             },
             'one_d_fitts': {
                 'title': '1D Fitts',
                 'thumbnail': 'Icons/1dfitts.png',
-                'module': OneDFitts().start_game
+                'module': lazy_game('Games.OneDFitts', lambda game: game.OneDFitts().start_game())
             },
             'two_d_fitts': {
                 'title': '2D Fitts',
                 'thumbnail': 'Icons/2dfitts.png',
-                'module': FittsLawTest().run
+                'module': lazy_game('Games.ISOFitts', lambda game: game.FittsLawTest().run())
             },
             'pca': {
                 'title': 'PCA',
@@ -71,63 +84,113 @@ class GameViewer:
             },'raw_data': {
                 'title': 'Raw Data',
                 'thumbnail': 'Icons/RawData.png',
-                'module': self.odh.visualize
+                'module': self.odh.visualize,
+                'needs_model': False
             }
         }
         
         # Store images to prevent garbage collection
         self.image_cache = {}
+        self.thumbnail_frames = {}
 
         self.create_game_cards()
-    
-    def on_closing(self):
-        self.root.destroy()
-        from Main import main
-        main(self.odh)
-
-    def set_up_classifier(self):
-        WINDOW_SIZE = 30 
-        WINDOW_INCREMENT = 5
-
-        self.names = ["Rest", "Close", "Open", "Pronation", "Supination"]
-
-        # Step 1: Parse offline training data 
-        #TODO: This is currently hardcoded. 
-        dataset_folder = 'Data/'
-        regex_filters = [
-            libemg.data_handler.RegexFilter(left_bound = "C_", right_bound="_R", values = self.names, description='classes'),
-            libemg.data_handler.RegexFilter(left_bound = "R_", right_bound="_T_", values = [str(i) for i in range(0,20)], description='reps'),
-        ]
-
-        offline_dh = libemg.data_handler.OfflineDataHandler()
-        offline_dh.get_data(folder_location=dataset_folder, regex_filters=regex_filters, delimiter=",")
-        train_windows, train_metadata = offline_dh.parse_windows(WINDOW_SIZE, WINDOW_INCREMENT)
-        self.labels = train_metadata['classes']
-
-        # Step 2: Extract features from offline data
-        fe = libemg.feature_extractor.FeatureExtractor()
-        feature_list = ['WENG']
-        self.training_features = fe.extract_features(feature_list, train_windows)
-
-        # Step 3: Dataset creation
-        data_set = {}
-        data_set['training_features'] = self.training_features
-        data_set['training_labels'] = train_metadata['classes']
-
-        # Step 4: Create the EMG Classifier
-        o_classifier = libemg.emg_predictor.EMGClassifier(model="LDA")
-        o_classifier.fit(feature_dictionary=data_set)
-        o_classifier.add_majority_vote(11)
-        o_classifier.add_velocity(train_windows, self.labels)
-
-        # Step 5: Create online EMG classifier and start classifying.
-        self.classifier = libemg.emg_predictor.OnlineEMGClassifier(o_classifier, WINDOW_SIZE, WINDOW_INCREMENT, self.odh, feature_list, std_out=False)
-        self.classifier.run(block=False) 
+
+        self.model = None
+        self.training_error = None
+        self.training_updates = None
+        self.after_id = None
+
+    def show(self):
+        self.root.title("Game Launcher")
+        self.root.geometry("800x600")
+        # Bind mouse wheel for scrolling
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+        # Setup classifier in the background so the launcher is usable straight away;
+        # unchanged recordings load from the classifier cache
+        self.start_training()
+
+    def hide(self):
+        self.canvas.unbind_all("<MouseWheel>")
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def close(self):
+        pass
+
+    def start_training(self):
+        # A run still in flight from an earlier visit is picked back up rather than duplicated
+        if self.training_updates is None:
+            # The running classifier keeps streaming; it is swapped only if the recordings changed
+            self.model = None
+            self.set_model_ready(False)
+            self.training_error = None
+            self.training_updates = queue.Queue()
+            threading.Thread(target=self.train_classifier, args=(self.training_updates,), daemon=True).start()
+        self.after_id = self.root.after(100, self.check_training)
+
+    def train_classifier(self, updates):
+        """Steps 1-4 on the training thread: train the offline classifier, or load it if the recordings have not changed"""
+        def progress(stage, done, total):
+            updates.put(('progress', (stage, done, total)))
+        try:
+            model = Training.load_or_train(self.catalog, Training.CLASS_NAMES, progress=progress)
+            updates.put(('done', model))
+        except Exception as e:
+            updates.put(('error', e))
+
+    def check_training(self):
+        """Show training progress and start classifying once the model arrives"""
+        while True:
+            try:
+                kind, value = self.training_updates.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                stage, done, total = value
+                text = Training.STAGES[stage] + (f" ({done}/{total})" if total > 1 else "") + "..."
+                self.status_label.configure(text=text, fg="#555555")
+            elif kind == 'done':
+                self.after_id = None
+                self.training_updates = None
+                try:
+                    self.set_up_classifier(value)
+                except Exception as e:
+                    self.show_training_error(e)
+                return
+            else:
+                self.after_id = None
+                self.training_updates = None
+                self.show_training_error(value)
+                return
+        self.after_id = self.root.after(100, self.check_training)
+
+    def show_training_error(self, error):
+        self.training_error = error
+        self.status_label.configure(text=f"Classifier unavailable: {error}", fg="#cc0000")
+
+    def set_up_classifier(self, model):
+        self.names = Training.CLASS_NAMES
+        self.training_features = model['training_features']
+        self.labels = model['labels']
+
+        # Step 5: Start classifying, or hand the model to the classifier that is already running
+        self.classifier_service.start(model)
+        self.model = model
+        self.status_label.configure(text="Classifier ready", fg="#2e7d32")
+        self.set_model_ready(True)
+
+    def set_model_ready(self, ready):
+        """Grey out the games that need the classifier until it is trained"""
+        for game_id, (frame, thumbnail) in self.thumbnail_frames.items():
+            if self.games[game_id].get('needs_model', True):
+                frame.configure(bg="white" if ready else "#dddddd")
+                thumbnail.configure(cursor="hand2" if ready else "watch")
 
     def setup_ui_framework(self):
         """Creates a scrollable frame for holding game cards."""
         # Create a frame to hold the canvas and scrollbar
-        self.container_frame = Frame(self.root, bg="white")
+        self.container_frame = Frame(self.frame, bg="white")
         self.container_frame.pack(fill="both", expand=True, padx=20, pady=(5, 20))
         
         # Create canvas - removing border with highlightthickness=0
@@ -146,9 +209,6 @@ class GameViewer:
         self.cards_frame = Frame(self.canvas, bg="white")
         self.canvas_window = self.canvas.create_window((0, 0), window=self.cards_frame, anchor="nw")
         
-        # Bind mouse wheel for scrolling
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
-        
         # Make the cards frame expand to fill canvas width
         self.canvas.bind('<Configure>', self._configure_canvas)
 
@@ -191,6 +251,7 @@ class GameViewer:
                 thumbnail.image = thumbnail_image  # Prevent garbage collection
                 self.image_cache[game_id] = thumbnail_image  # Store in cache
                 thumbnail.pack(padx=10, pady=10)  # Add padding inside the frame
+                self.thumbnail_frames[game_id] = (thumbnail_frame, thumbnail)
                 
                 # Bind click events to both the frame and thumbnail
                 thumbnail_frame.bind('<Button-1>', lambda e, g=game_id: self.launch_game(g))
@@ -236,18 +297,22 @@ class GameViewer:
 
     def launch_game(self, game_id):
         """Launch the selected game in a new window."""
+        if self.games[game_id].get('needs_model', True) and self.model is None:
+            if self.training_error is not None:
+                messagebox.showerror("Error", f"Cannot launch {self.games[game_id]['title']} without a classifier: {self.training_error}")
+            else:
+                self.status_label.configure(text="Still training the classifier - the game will be available shortly", fg="#555555")
+            return
+        # Games run in their own window on this thread; the launcher comes back when they exit
+        self.root.withdraw()
         try:
-            self.root.destroy()
-            self.root.quit()
             if game_id == 'pca':
-                self.classifier.stop_running()
-                self.odh.visualize_feature_space(self.training_features, 30, 20, 200, classes = self.labels, class_labels=self.names)
+                self.odh.visualize_feature_space(self.training_features, 30, 20, self.sample_rate, classes = self.labels, class_labels=self.names)
+                # The feature-space view resets the data handler, which the running predictor counts samples on
+                self.classifier_service.restart()
             else:
                 self.games[game_id]['module']()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to launch {self.games[game_id]['title']}: {str(e)}")
-
-def launch_game_viewer(odh):
-    root = Tk()
-    app = GameViewer(root, odh)
-    root.mainloop()
\ No newline at end of file
+        finally:
+            self.root.deiconify()
@@ -1,7 +1,7 @@
 import pygame
 import math
 import time
-import socket
+from Games.controls import ControlReceiver
 
 class FittsLawTest:
     def __init__(self, num_circles=8, num_trials=16, fps=60, width=1250, height=750):
@@ -105,11 +105,9 @@ class FittsLawTest:
                     self.current_direction[1] += self.VEL
             
         self.current_direction = [0,0]
-        data, _ = self.sock.recvfrom(1024)
-        data = str(data.decode("utf-8"))
-        if data:
-            input_class = float(data.split(' ')[0])
-            velocity = float(data.split(' ')[1])
+        decision = self.controls.poll()
+        if decision is not None:
+            input_class, velocity = decision
             # 0 = Hand Closed
             if input_class == 1:
                 self.current_direction[0] -= self.VEL * velocity
@@ -171,12 +169,14 @@ class FittsLawTest:
         self.clock = pygame.time.Clock()
 
         # Socket for reading EMG
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) 
-        self.sock.bind(('127.0.0.1', 12346))
-
-        while not self.done:
-            # updated frequently for graphics & gameplay
-            self.update_game()
-            pygame.display.update()
-            self.clock.tick(self.fps)
-        pygame.quit()
\ No newline at end of file
+        self.controls = ControlReceiver()
+
+        try:
+            while not self.done:
+                # updated frequently for graphics & gameplay
+                self.update_game()
+                pygame.display.update()
+                self.clock.tick(self.fps)
+        finally:
+            self.controls.close()
+            pygame.quit()
\ No newline at end of file
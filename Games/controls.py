@@ -0,0 +1,106 @@
+import socket
+import struct
+
+CONTROL_ADDRESS = ('127.0.0.1', 12346)
+
+# Binary decision packet, little-endian: version, class id, velocity, sequence number, send time (time.time())
+PROTOCOL_VERSION = 1
+PACKET = struct.Struct('<BbfId')
+SEQ_MODULO = 2 ** 32
+
+def encode_packet(input_class, velocity, seq, timestamp):
+    return PACKET.pack(PROTOCOL_VERSION, input_class, velocity, seq % SEQ_MODULO, timestamp)
+
+def parse_decision(data):
+    """Parses a text packet ("class velocity", velocity optional) into (class, velocity), or None if malformed."""
+    try:
+        fields = data.decode("utf-8").split()
+        velocity = float(fields[1]) if len(fields) > 1 else 1.0
+        return int(float(fields[0])), velocity
+    except (UnicodeDecodeError, ValueError, IndexError):
+        return None
+
+def decode_packet(data):
+    """Decodes either packet format into (class, velocity, seq, timestamp), or None if malformed.
+
+    Text packets always start with an ASCII digit or '-', never with the version byte, so
+    the two formats can share the port; text packets have no seq or timestamp (None).
+    """
+    if len(data) == PACKET.size and data[0] == PROTOCOL_VERSION:
+        _, input_class, velocity, seq, timestamp = PACKET.unpack(data)
+        return input_class, velocity, seq, timestamp
+    decision = parse_decision(data)
+    if decision is None:
+        return None
+    return decision[0], decision[1], None, None
+
+class ControlReceiver:
+    """Non-blocking reader for the classifier's decisions, shared by every game.
+
+    poll() is called once per frame and drains every datagram that arrived since the last
+    frame, keeping only the newest. A classifier that sends faster than the game draws
+    therefore never builds up a backlog: the game always acts on the latest decision, and
+    `coalesced` records how many older ones were skipped to get there.
+
+    Binary packets also carry a sequence number: gaps are counted in `lost`, and a packet
+    older than one already seen is counted in `reordered` (and no longer as lost) and
+    ignored, as are duplicates. A sequence that jumps back with a newer send time is a restarted classifier.
+    """
+    def __init__(self, address=CONTROL_ADDRESS):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(address)
+        self.sock.setblocking(0)
+        self.latest = None
+        self.coalesced = 0
+        self.received = 0
+        self.seq = None
+        self.timestamp = None
+        self.lost = 0
+        self.reordered = 0
+
+    def accept(self, seq, timestamp):
+        """Tracks the sequence number of a binary packet; returns False if the packet is stale."""
+        if self.seq is not None:
+            gap = (seq - self.seq) % SEQ_MODULO
+            if (gap == 0 or gap > SEQ_MODULO // 2) and timestamp <= self.timestamp:
+                if gap:
+                    self.reordered += 1
+                    self.lost = max(self.lost - 1, 0)
+                return False
+            if 0 < gap <= SEQ_MODULO // 2:
+                self.lost += gap - 1
+        self.seq = seq
+        self.timestamp = timestamp
+        return True
+
+    def poll(self):
+        """Returns the newest (class, velocity) received since the last poll, or None if nothing new arrived."""
+        decision = None
+        count = 0
+        while True:
+            try:
+                data = self.sock.recv(1024)
+            except (BlockingIOError, InterruptedError):
+                break
+            packet = decode_packet(data)
+            if packet is None:
+                continue
+            input_class, velocity, seq, timestamp = packet
+            if seq is not None and not self.accept(seq, timestamp):
+                continue
+            decision = (input_class, velocity)
+            count += 1
+        self.received += count
+        self.coalesced = max(count - 1, 0)
+        if decision is not None:
+            self.latest = decision
+        return decision
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,20 +1,16 @@
 import pygame
 import time 
 import numpy as np
-import socket
 import os 
-
-def handle_emg(sock):
-    try:
-        data, _ = sock.recvfrom(1024)
-    except:
-        return None 
-    
-    data = str(data.decode("utf-8"))
-    if data:
-        input_class = float(data.split(' ')[0])
-        if input_class != 0:
-            return input_class - 1
+from Games.controls import ControlReceiver
+
+def handle_emg(controls):
+    decision = controls.poll()
+    if decision is None:
+        return None
+    input_class, _ = decision
+    if input_class != 0:
+        return input_class - 1
     return -1
 
 TEST_TIME = 120
@@ -89,114 +85,114 @@ def start_game():
         for i in img_files:
             imgs.append(pygame.transform.smoothscale(pygame.image.load(i), (100,100)))
 
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) 
-    sock.bind(('127.0.0.1', 12346))
-    sock.setblocking(0)
-
-    last_note = time.time()
-    start_time = time.time() + TEST_TIME
-
-    notes = []
-    key_pressed = -1
-    score = 0
-    combo = 0
-
-    # Run until the user asks to quit
-    running = True
-    while running:
-        clock.tick(60)
-
-        gen_time = ((start_time - time.time())/TEST_TIME) * (MAX_TIME - MIN_TIME) + MIN_TIME
-        if time.time() - last_note > gen_time: # Generation
-            new_note = np.random.randint(0,4)
-            notes.append(Note(new_note))
-            last_note = time.time()
-
-        if start_time - time.time() <= 0:
-            running = False
-
-        # Fill the background with white
-        screen.fill((255, 255, 255))
-
-        # Update time remaining 
-        text = font.render('{0:.1f}'.format(start_time - time.time()), True, (0,0,0))
-        textRect = text.get_rect()
-        textRect.center = (470, 25)
-        screen.blit(text, textRect)
-
-        # Display score
-        score_text = score_font.render(f'Score: {score}', True, (0,0,0))
-        score_rect = score_text.get_rect()
-        score_rect.center = (200, 25)
-        screen.blit(score_text, score_rect)
-
-        # Display combo if > 0
-        if combo > 1:
-            combo_text = font.render(f'Combo x{combo}!', True, (255,0,0))
-            combo_rect = combo_text.get_rect()
-            combo_rect.center = (200, 60)
-            screen.blit(combo_text, combo_rect)
-
-        # Did the user click the window close button?
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+    controls = ControlReceiver()
+
+    try:
+        last_note = time.time()
+        start_time = time.time() + TEST_TIME
+
+        notes = []
+        key_pressed = -1
+        score = 0
+        combo = 0
+
+        # Run until the user asks to quit
+        running = True
+        while running:
+            clock.tick(60)
+
+            gen_time = ((start_time - time.time())/TEST_TIME) * (MAX_TIME - MIN_TIME) + MIN_TIME
+            if time.time() - last_note > gen_time: # Generation
+                new_note = np.random.randint(0,4)
+                notes.append(Note(new_note))
+                last_note = time.time()
+
+            if start_time - time.time() <= 0:
                 running = False
+
+            # Fill the background with white
+            screen.fill((255, 255, 255))
+
+            # Update time remaining 
+            text = font.render('{0:.1f}'.format(start_time - time.time()), True, (0,0,0))
+            textRect = text.get_rect()
+            textRect.center = (470, 25)
+            screen.blit(text, textRect)
+
+            # Display score
+            score_text = score_font.render(f'Score: {score}', True, (0,0,0))
+            score_rect = score_text.get_rect()
+            score_rect.center = (200, 25)
+            screen.blit(score_text, score_rect)
+
+            # Display combo if > 0
+            if combo > 1:
+                combo_text = font.render(f'Combo x{combo}!', True, (255,0,0))
+                combo_rect = combo_text.get_rect()
+                combo_rect.center = (200, 60)
+                screen.blit(combo_text, combo_rect)
+
+            # Did the user click the window close button?
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
         
-        # Deal with key presses 
-        current_frame_keys = set()
+            # Deal with key presses 
+            current_frame_keys = set()
         
-        val = handle_emg(sock)
-        if val != None and val != key_pressed:
-            key_pressed = val
-            current_frame_keys.add(val)
-
-        # Draw notes on bottom of screen 
-        pygame.draw.circle(screen, (255, 0, 0), (75, 500), 35, width=8 - (key_pressed==0) * 8)
-        pygame.draw.circle(screen, (0, 255, 0), (200, 500), 35, width=8  - (key_pressed==1) * 8)
-        pygame.draw.circle(screen, (0, 0, 255), (325, 500), 35, width=8  - (key_pressed==2) * 8)
-        pygame.draw.circle(screen, (255, 165, 0), (450, 500), 35, width=8  - (key_pressed==3) * 8)
-
-        # Move and deal with notes coming down 
-        hit_this_frame = False
-        for n in notes:
-            speed = (1 - (start_time - time.time())/TEST_TIME) * (MAX_SPEED - MIN_SPEED) + MIN_SPEED
-            if n.move_note(speed=speed) == -1:
-                notes.remove(n)
-                if not n.hit:  # Only break combo if note wasn't hit at all
-                    combo = 0
-                continue
-
-            # Check for note hits and update score
-            points = n.check_hit(key_pressed)
-            if points > 0:
-                hit_this_frame = True
-                if points >= 50:  # Only increase combo on initial hits, not hold points
-                    combo += 1
-                score += points * (combo // 5 + 1)  # Bonus points for higher combos
-
-            # Draw the note
-            w = 0
-            if n.type == key_pressed and n.y_pos >= 500 and n.y_pos - 60 - n.length <= 500:
-                w = 5
-            pygame.draw.circle(screen, n.color, (n.x_pos, n.y_pos), 35, width=w)
-            pygame.draw.rect(screen, n.color, (n.x_pos - 20, n.y_pos - 30 - n.length, 40, n.length), width=w)
-            pygame.draw.circle(screen, n.color, (n.x_pos, n.y_pos - 60 - n.length), 35, width=w)
-
-        # Break combo if pressing wrong buttons
-        if not hit_this_frame and key_pressed != -1:
-            combo = 0
-
-        pygame.draw.rect(screen, (255,255,255), (0, 550, 1000, 300))
-
-        # Draw images on screen 
-        if len(imgs) > 0:
-            screen.blit(imgs[0], (25,550))
-            screen.blit(imgs[1], (150,550))
-            screen.blit(imgs[2], (275,550))
-            screen.blit(imgs[3], (400,550))
+            val = handle_emg(controls)
+            if val != None and val != key_pressed:
+                key_pressed = val
+                current_frame_keys.add(val)
+
+            # Draw notes on bottom of screen 
+            pygame.draw.circle(screen, (255, 0, 0), (75, 500), 35, width=8 - (key_pressed==0) * 8)
+            pygame.draw.circle(screen, (0, 255, 0), (200, 500), 35, width=8  - (key_pressed==1) * 8)
+            pygame.draw.circle(screen, (0, 0, 255), (325, 500), 35, width=8  - (key_pressed==2) * 8)
+            pygame.draw.circle(screen, (255, 165, 0), (450, 500), 35, width=8  - (key_pressed==3) * 8)
+
+            # Move and deal with notes coming down 
+            hit_this_frame = False
+            for n in notes:
+                speed = (1 - (start_time - time.time())/TEST_TIME) * (MAX_SPEED - MIN_SPEED) + MIN_SPEED
+                if n.move_note(speed=speed) == -1:
+                    notes.remove(n)
+                    if not n.hit:  # Only break combo if note wasn't hit at all
+                        combo = 0
+                    continue
+
+                # Check for note hits and update score
+                points = n.check_hit(key_pressed)
+                if points > 0:
+                    hit_this_frame = True
+                    if points >= 50:  # Only increase combo on initial hits, not hold points
+                        combo += 1
+                    score += points * (combo // 5 + 1)  # Bonus points for higher combos
+
+                # Draw the note
+                w = 0
+                if n.type == key_pressed and n.y_pos >= 500 and n.y_pos - 60 - n.length <= 500:
+                    w = 5
+                pygame.draw.circle(screen, n.color, (n.x_pos, n.y_pos), 35, width=w)
+                pygame.draw.rect(screen, n.color, (n.x_pos - 20, n.y_pos - 30 - n.length, 40, n.length), width=w)
+                pygame.draw.circle(screen, n.color, (n.x_pos, n.y_pos - 60 - n.length), 35, width=w)
+
+            # Break combo if pressing wrong buttons
+            if not hit_this_frame and key_pressed != -1:
+                combo = 0
+
+            pygame.draw.rect(screen, (255,255,255), (0, 550, 1000, 300))
+
+            # Draw images on screen 
+            if len(imgs) > 0:
+                screen.blit(imgs[0], (25,550))
+                screen.blit(imgs[1], (150,550))
+                screen.blit(imgs[2], (275,550))
+                screen.blit(imgs[3], (400,550))
         
-        # Flip the display
-        pygame.display.flip()
-
-    # Done! Time to quit.
-    pygame.quit()
\ No newline at end of file
+            # Flip the display
+            pygame.display.flip()
+    finally:
+        # Done! Time to quit.
+        controls.close()
+        pygame.quit()
\ No newline at end of file
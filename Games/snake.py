@@ -1,8 +1,8 @@
 import pygame
 import random
-import socket
 from pygame.locals import *
 from collections import deque
+from Games.controls import ControlReceiver
 
 class SnakeGame:
     def __init__(self):
@@ -54,38 +54,27 @@ class SnakeGame:
                     self.move_snake()
     
     def handle_emg(self):
-        try:
-            data, _ = self.sock.recvfrom(1024)
-            data_str = data.decode("utf-8")
-            
-            try:
-                input_class = float(data_str.split(' ')[0])
-                
-                new_direction = None
-                # Map EMG signals to directions
-                if input_class == 1:
-                    new_direction = "left"
-                elif input_class == 2:
-                    new_direction = "right"
-                elif input_class == 3:
-                    new_direction = "down"
-                elif input_class == 4:
-                    new_direction = "up"
-                
-                if new_direction:
-                    self.current_direction = new_direction
-                    self.previous_key_presses.append(new_direction)
-                    self.move_snake()
-            except (ValueError, IndexError):
-                # Handle invalid data format
-                pass
-                
-        except BlockingIOError:
-            # No data available, not an error
-            pass
-        except Exception as e:
-            # Log other exceptions
-            print(f"EMG error: {e}")
+        # Only the newest decision since the last frame matters
+        decision = self.controls.poll()
+        if decision is None:
+            return
+        input_class, _ = decision
+
+        new_direction = None
+        # Map EMG signals to directions
+        if input_class == 1:
+            new_direction = "left"
+        elif input_class == 2:
+            new_direction = "right"
+        elif input_class == 3:
+            new_direction = "down"
+        elif input_class == 4:
+            new_direction = "up"
+
+        if new_direction:
+            self.current_direction = new_direction
+            self.previous_key_presses.append(new_direction)
+            self.move_snake()
     
     def move_snake(self):
         # Always store the current position before moving
@@ -150,50 +139,50 @@ class SnakeGame:
         self.clock = pygame.time.Clock()
 
         # Socket for reading EMG
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) 
-        self.sock.bind(('127.0.0.1', 12346))
-        self.sock.setblocking(0)
+        self.controls = ControlReceiver()
         
-        # Initialize with a default direction
-        self.previous_key_presses.append(self.current_direction)
+        try:
+            # Initialize with a default direction
+            self.previous_key_presses.append(self.current_direction)
 
-        while self.running: 
-            # Fill the background
-            self.window.fill((233, 233, 233))
+            while self.running: 
+                # Fill the background
+                self.window.fill((233, 233, 233))
 
-            # Handle keyboard events
-            self.handle_events()
+                # Handle keyboard events
+                self.handle_events()
             
-            # Handle EMG input
-            self.handle_emg()
+                # Handle EMG input
+                self.handle_emg()
             
-            # Auto-movement: move snake in current direction each frame
-            # This makes the game playable even with input lag
-            if len(self.previous_key_presses) > 0:
-                self.move_snake()
-
-            # Check for collision between snake and target
-            snake = Rect(self.snake_head[0], self.snake_head[1], 20, 20)
-            target = Rect(self.target[0], self.target[1], 20, 20)
-            if pygame.Rect.colliderect(snake, target):
-                self.generate_target()
-                self.grow_snake()
-                self.score += 1
-
-            # Draw Snake
-            pygame.draw.rect(self.window, self.head_blue, snake, border_radius=2)
-            for b in self.snake_body:
-                pygame.draw.rect(self.window, self.snake_green, [b[0], b[1], 20, 20], border_radius=2)
-
-            # Draw Target 
-            pygame.draw.rect(self.window, self.red, target)
-
-            # Score label
-            myfont = pygame.font.SysFont("arial bold", 30)
-            label = myfont.render("Score: " + str(self.score), 1, (0, 0, 0))
-            self.window.blit(label, (self.width - 100, 10))
-
-            pygame.display.update()
-            self.clock.tick(120)
-
-        pygame.quit()
\ No newline at end of file
+                # Auto-movement: move snake in current direction each frame
+                # This makes the game playable even with input lag
+                if len(self.previous_key_presses) > 0:
+                    self.move_snake()
+
+                # Check for collision between snake and target
+                snake = Rect(self.snake_head[0], self.snake_head[1], 20, 20)
+                target = Rect(self.target[0], self.target[1], 20, 20)
+                if pygame.Rect.colliderect(snake, target):
+                    self.generate_target()
+                    self.grow_snake()
+                    self.score += 1
+
+                # Draw Snake
+                pygame.draw.rect(self.window, self.head_blue, snake, border_radius=2)
+                for b in self.snake_body:
+                    pygame.draw.rect(self.window, self.snake_green, [b[0], b[1], 20, 20], border_radius=2)
+
+                # Draw Target 
+                pygame.draw.rect(self.window, self.red, target)
+
+                # Score label
+                myfont = pygame.font.SysFont("arial bold", 30)
+                label = myfont.render("Score: " + str(self.score), 1, (0, 0, 0))
+                self.window.blit(label, (self.width - 100, 10))
+
+                pygame.display.update()
+                self.clock.tick(120)
+        finally:
+            self.controls.close()
+            pygame.quit()
\ No newline at end of file
@@ -1,21 +1,41 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import os
-import pandas as pd
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+import bisect
+from RecordingIO import RecordingLoader, load_recording, export_csv, delete_recording
+from Previews import PreviewCache
+from Sparkline import draw_sparkline
+from Downsample import decimate, stack_channels
+
+CARD_WIDTH = 270
+CARD_HEIGHT = 250
+CARD_PAD = 10
+PLOT_WIDTH = 250
+PLOT_HEIGHT = 150
 
 class GestureApp:
-    def __init__(self, root, odh):
+    def __init__(self, root, odh, catalog):
         self.root = root
         self.odh = odh 
-        self.root.title("Gesture Visualization")
-        self.root.geometry("800x600")
-        self.root.configure(bg="#f5f5f5")
-        self.root.protocol("WM_DELETE_WINDOW", self.on_closing) 
+        self.frame = tk.Frame(root, bg="#f5f5f5")
+        self.catalog = catalog
+        self.previews = PreviewCache('Data')
+        self.previews.prune([r['path'] for r in self.catalog.recordings()])
+        self.loader = RecordingLoader()
+        self.pending = {}
+        self.pending_id = None
+        self.columns = 3 # cards per row
+        self.poll_ms = 1000
+        self.after_id = None
+        self.recordings = []
+        self.keys = []
+
+        # Only the cards in or near the viewport exist as widgets; they are recycled while scrolling
+        self.visible = {}
+        self.pool = []
 
         # Create outer frame to center everything
-        self.outer_frame = tk.Frame(self.root, bg="#f5f5f5")
+        self.outer_frame = tk.Frame(self.frame, bg="#f5f5f5")
         self.outer_frame.pack(fill="both", expand=True)
         
         # Configure column and row weights to center content
@@ -33,7 +53,7 @@ class GestureApp:
         # Create canvas
         self.canvas = tk.Canvas(
             self.scrollable_frame,
-            yscrollcommand=self.scrollbar.set,
+            yscrollcommand=self.on_scroll,
             bg="#f5f5f5",
             highlightthickness=0
         )
@@ -41,14 +61,14 @@ class GestureApp:
 
         self.scrollbar.config(command=self.canvas.yview)
 
-        # Create content frame
+        # Create content frame for the header; cards are placed on the canvas below it
         self.content_frame = tk.Frame(self.canvas, bg="#f5f5f5")
         
         # Center the content frame in the canvas
         self.canvas_frame = self.canvas.create_window(
             (0, 0),
             window=self.content_frame,
-            anchor="center",
+            anchor="n",
             tags="content"
         )
 
@@ -77,128 +97,290 @@ class GestureApp:
         )
         self.delete_all_button.pack(pady=5)
 
-        # Create frame for cards
-        self.cards_frame = tk.Frame(self.content_frame, bg="#f5f5f5")
-        self.cards_frame.pack(expand=True)
+        # Create button to export recordings in the old CSV format
+        self.export_button = tk.Button(
+            self.content_frame,
+            text="Export CSV",
+            command=self.export_gestures,
+            bg="white",
+            fg="black",
+            relief="flat",
+            font=("Helvetica", 10),
+            width=20,
+            highlightthickness=0,
+            activebackground="white"
+        )
+        self.export_button.pack(pady=5)
+        self.content_frame.update_idletasks()
+        self.header_height = self.content_frame.winfo_reqheight() + CARD_PAD
 
         # Bind resize event
         self.canvas.bind('<Configure>', self.on_canvas_configure)
-        self.content_frame.bind('<Configure>', self.on_frame_configure)
 
         self.load_gestures()
-    
-    def on_closing(self):
-        self.root.destroy()
-        from Main import main
-        main(self.odh)
+
+    def show(self):
+        self.root.title("Gesture Visualization")
+        self.root.geometry("800x600")
+        # Catch up with recordings made while the screen was hidden
+        if self.after_id is None:
+            self.poll_catalog()
+
+    def hide(self):
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def close(self):
+        self.loader.close()
 
     def on_canvas_configure(self, event):
-        # Update the width of the canvas window
-        self.canvas.itemconfig(
-            "content",
-            width=event.width
-        )
-        
-    def on_frame_configure(self, event):
-        # Reset the scroll region to encompass the content
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # Update the width of the canvas window and re-flow the cards for the new size
+        self.canvas.itemconfig("content", width=event.width)
+        self.canvas.coords(self.canvas_frame, event.width / 2, 0)
+        self.place_cards()
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.render_visible()
 
     def load_gestures(self):
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+
         # Clear existing gestures
-        for widget in self.cards_frame.winfo_children():
-            widget.destroy()
+        for path in list(self.visible):
+            self.hide_card(path)
 
         # Get and sort gestures
-        filenames = sorted(os.listdir("Data/"))
-
-        # Create gesture cards in a grid layout
-        row = 0
-        col = 0
-        for filename in filenames:
-            # Create card frame
-            card = tk.Frame(
-                self.cards_frame,
-                bg="white",
-                relief="solid",
-                borderwidth=1
-            )
-            card.grid(row=row, column=col, padx=10, pady=10)
-
-            # Gesture type label
-            title_label = tk.Label(
-                card,
-                text=filename.split("_")[1].capitalize(),
-                bg="white",
-                fg="#333333",
-                font=("Helvetica", 16, "bold")
-            )
-            title_label.pack(pady=(10, 5))
-
-            # Create plot
-            fig = Figure(figsize=(2.5, 1.5))
-            ax = fig.add_subplot(111)
-            
-            data = pd.read_csv("Data/" + filename)
-            ax.plot(data, linewidth=1)
-            ax.set_xticks([])
-            ax.set_yticks([])
-            ax.set_facecolor('#ffffff')
-            fig.patch.set_facecolor('#ffffff')
-            
-            # Remove spines
-            for spine in ax.spines.values():
-                spine.set_visible(False)
-
-            # Add plot to card
-            canvas = FigureCanvasTkAgg(fig, master=card)
-            canvas.draw()
-            canvas_widget = canvas.get_tk_widget()
-            canvas_widget.pack(pady=5, padx=10)
-
-            # Delete button - fix button styling
-            delete_button = tk.Button(
-                card,
-                text="Delete",
-                command=lambda f=filename: self.delete_gesture(f),
-                bg="white",
-                fg="black",
-                relief="flat",
-                font=("Helvetica", 10),
-                width=10,
-                highlightthickness=0,  # Remove highlight border
-                activebackground="white",  # Keep white when clicked
-                activeforeground="black",  # Keep text black when clicked
-                bd=0  # Remove any border
-            )
-            delete_button.pack(pady=(5, 10))
-
-            # Update grid position
-            col += 1
-            if col == 3:  # 3 cards per row
-                col = 0
-                row += 1
-
-        # Configure grid columns to be equal width
-        for i in range(3):
-            self.cards_frame.grid_columnconfigure(i, weight=1)
-        
-        self.root.after(100, lambda: self.canvas.yview_moveto(0))
+        self.recordings = sorted(self.catalog.recordings(), key=self.card_key)
+        self.keys = [self.card_key(r) for r in self.recordings]
+        self.place_cards()
+        self.canvas.yview_moveto(0)
+        self.after_id = self.root.after(self.poll_ms, self.poll_catalog)
+
+    def card_key(self, recording):
+        return (recording['class'], recording['rep'], recording['path'])
+
+    def place_cards(self):
+        """Size the scroll region for every recording, then lay out the visible cards"""
+        rows = (len(self.recordings) + self.columns - 1) // self.columns
+        height = self.header_height + rows * (CARD_HEIGHT + 2 * CARD_PAD)
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), max(height, self.canvas.winfo_height())))
+        self.render_visible()
+
+    def card_position(self, index):
+        column_width = CARD_WIDTH + 2 * CARD_PAD
+        left = max(0, (self.canvas.winfo_width() - self.columns * column_width) / 2)
+        x = left + (index % self.columns) * column_width + CARD_PAD
+        y = self.header_height + (index // self.columns) * (CARD_HEIGHT + 2 * CARD_PAD) + CARD_PAD
+        return x, y
+
+    def visible_range(self):
+        # One extra row above and below the viewport so cards are ready before they scroll in
+        row_height = CARD_HEIGHT + 2 * CARD_PAD
+        top = self.canvas.canvasy(0) - self.header_height
+        bottom = top + self.canvas.winfo_height()
+        first = max(0, int(top // row_height) - 1) * self.columns
+        last = min(len(self.recordings), (int(bottom // row_height) + 2) * self.columns)
+        return first, last
+
+    def render_visible(self):
+        first, last = self.visible_range()
+        wanted = {self.recordings[i]['path']: i for i in range(first, last)}
+        for path in list(self.visible):
+            if path not in wanted:
+                self.hide_card(path)
+        for path, index in wanted.items():
+            card = self.visible.get(path)
+            if card is None:
+                card = self.pool.pop() if self.pool else GestureCard(self)
+                card.show(self.recordings[index])
+                self.visible[path] = card
+            card.move(*self.card_position(index))
+
+    def hide_card(self, path):
+        card = self.visible.pop(path)
+        card.hide()
+        self.pool.append(card)
+
+    def load_preview(self, card):
+        self.pending[card] = (card.path, self.loader.submit(self.previews.get, card.path))
+        if self.pending_id is None:
+            self.pending_id = self.root.after(30, self.check_previews)
+
+    def check_previews(self):
+        """Draw the previews that have finished loading, skipping cards recycled since they were requested"""
+        for card, (path, future) in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[card]
+            if card.path != path:
+                continue
+            try:
+                card.draw(future.result())
+            except Exception as e:
+                card.plot.delete("all")
+                card.plot.create_text(PLOT_WIDTH / 2, PLOT_HEIGHT / 2, text="Could not load", fill="#cc0000")
+                print(f"Error loading preview for {path}: {e}")
+        self.pending_id = self.root.after(30, self.check_previews) if self.pending else None
+
+    def add_card(self, recording):
+        index = bisect.bisect(self.keys, self.card_key(recording))
+        self.keys.insert(index, self.card_key(recording))
+        self.recordings.insert(index, recording)
+        self.place_cards()
+
+    def remove_card(self, path):
+        index = next((i for i, r in enumerate(self.recordings) if r['path'] == path), None)
+        if index is None:
+            return
+        del self.recordings[index]
+        del self.keys[index]
+        if path in self.visible:
+            self.hide_card(path)
+        self.place_cards()
+
+    def poll_catalog(self):
+        """Pick up recordings added or deleted elsewhere (e.g. by a data collection window)"""
+        try:
+            self.catalog.refresh()
+        except (OSError, ValueError) as e:
+            print("Could not refresh the catalog:", e)
+        shown = set(r['path'] for r in self.recordings)
+        current = {r['path']: r for r in self.catalog.recordings()}
+        for path in shown - set(current):
+            self.remove_card(path)
+        for path in current:
+            if path not in shown:
+                self.add_card(current[path])
+        self.after_id = self.root.after(self.poll_ms, self.poll_catalog)
 
     def delete_all_gestures(self):
         if messagebox.askyesno("Confirm Delete", 
                             f"Are you sure you want to delete all gestures?"):
-            for filename in os.listdir("Data"):
-                os.remove(os.path.join("Data", filename))
+            for recording in self.catalog.recordings():
+                delete_recording(recording['path'])
+            self.catalog.clear()
+            self.previews.prune([])
             self.load_gestures()
 
 
-    def delete_gesture(self, filename):
+    def export_gestures(self):
+        folder = filedialog.askdirectory(title="Export recordings as CSV")
+        if folder:
+            for recording in self.catalog.recordings():
+                filename = os.path.splitext(os.path.basename(recording['path']))[0] + ".csv"
+                export_csv(recording['path'], os.path.join(folder, filename))
+            messagebox.showinfo("Export", f"Recordings exported to {folder}")
+
+    def show_recording(self, path):
+        """Opens a window with every sample of one recording"""
+        if path is None:
+            return
+        # matplotlib is only needed here, so it is not imported until a recording is opened
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from matplotlib.figure import Figure
+
+        window = tk.Toplevel(self.root)
+        window.title(os.path.basename(path))
+        fig = Figure(figsize=(8, 4))
+        ax = fig.add_subplot(111)
+        # Decimated to the screen width and stacked with outlier-proof offsets; long sessions stay responsive
+        x, y = decimate(load_recording(path), self.root.winfo_screenwidth())
+        stacked, offsets = stack_channels(y)
+        ax.plot(x, stacked, linewidth=1)
+        ax.set_yticks(offsets)
+        ax.set_yticklabels([f"Ch {c + 1}" for c in range(len(offsets))])
+        ax.set_xlabel("Sample")
+        ax.set_ylabel("EMG")
+        canvas = FigureCanvasTkAgg(fig, master=window)
+        canvas.draw()
+        NavigationToolbar2Tk(canvas, window)
+        canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def delete_gesture(self, path):
         if messagebox.askyesno("Confirm Delete", 
-                            f"Are you sure you want to delete {filename}?"):
-            os.remove(os.path.join("Data", filename))
-            self.cards_frame.after(100, self.load_gestures)
-
-def view_data(odh):
-    root = tk.Tk()
-    app = GestureApp(root, odh)
-    root.mainloop()
\ No newline at end of file
+                            f"Are you sure you want to delete {os.path.basename(path)}?"):
+            delete_recording(path)
+            self.catalog.remove(path)
+            self.previews.remove(path)
+            self.remove_card(path)
+
+class GestureCard:
+    """A recycled card widget: a title, a thumbnail of the recording and a delete button."""
+    def __init__(self, app):
+        self.app = app
+        self.path = None
+
+        # Create card frame
+        self.frame = tk.Frame(
+            app.canvas,
+            bg="white",
+            relief="solid",
+            borderwidth=1,
+            width=CARD_WIDTH,
+            height=CARD_HEIGHT
+        )
+        self.frame.pack_propagate(False)
+        self.item = app.canvas.create_window(0, 0, window=self.frame, anchor="nw", state="hidden")
+
+        # Gesture type label
+        self.title_label = tk.Label(
+            self.frame,
+            bg="white",
+            fg="#333333",
+            font=("Helvetica", 16, "bold")
+        )
+        self.title_label.pack(pady=(10, 5))
+
+        # Create plot - click it for the full recording
+        self.plot = tk.Canvas(
+            self.frame,
+            width=PLOT_WIDTH,
+            height=PLOT_HEIGHT,
+            bg="white",
+            highlightthickness=0,
+            cursor="hand2"
+        )
+        self.plot.pack(pady=5, padx=10)
+        self.plot.bind("<Button-1>", lambda event: app.show_recording(self.path))
+
+        # Delete button - fix button styling
+        self.delete_button = tk.Button(
+            self.frame,
+            text="Delete",
+            command=lambda: app.delete_gesture(self.path),
+            bg="white",
+            fg="black",
+            relief="flat",
+            font=("Helvetica", 10),
+            width=10,
+            highlightthickness=0,  # Remove highlight border
+            activebackground="white",  # Keep white when clicked
+            activeforeground="black",  # Keep text black when clicked
+            bd=0  # Remove any border
+        )
+        self.delete_button.pack(pady=(5, 10))
+
+    def show(self, recording):
+        self.path = recording['path']
+        self.title_label.configure(text=recording['class'].capitalize())
+
+        # Thumbnails are drawn from the cached min/max envelope rather than every sample,
+        # read on the loader pool so the grid fills in as previews arrive
+        self.plot.delete("all")
+        self.plot.create_text(PLOT_WIDTH / 2, PLOT_HEIGHT / 2, text="Loading...", fill="#999999")
+        self.app.load_preview(self)
+
+    def draw(self, preview):
+        low, high = preview
+        draw_sparkline(self.plot, low, high, PLOT_WIDTH, PLOT_HEIGHT)
+
+    def move(self, x, y):
+        self.app.canvas.coords(self.item, x, y)
+        self.app.canvas.itemconfigure(self.item, state="normal")
+
+    def hide(self):
+        self.app.canvas.itemconfigure(self.item, state="hidden")
+        self.path = None
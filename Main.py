@@ -1,33 +1,107 @@
 from tkinter import Tk, Button, Frame
-from GameViewer import launch_game_viewer
-from DataCollection import collect_data
-from GestureViewer import view_data
-import libemg 
+from GameViewer import GameViewer
+from DataCollection import DataCollectionApp
+from GestureViewer import GestureApp
+from ClassifierService import ClassifierService
+from RecordingCatalog import RecordingCatalog
+import libemg
+
+# EMG sampling rate of the Myo armband, the device main() streams from
+MYO_SAMPLE_RATE = 200
 
 def create_button(root, text, command):
-    button_frame = Frame(root, padx=20, pady=20, bg="white") 
-    button_frame.pack(side="top", fill="x") 
-    button = Button(button_frame, text=text, command=command, font=("Arial", 16), padx=20, pady=10, bg="white") 
+    button_frame = Frame(root, padx=20, pady=20, bg="white")
+    button_frame.pack(side="top", fill="x")
+    button = Button(button_frame, text=text, command=command, font=("Arial", 16), padx=20, pady=10, bg="white")
     button.pack(expand=True, fill="both")
 
-def main(odh = None):
+class MainMenu:
+    def __init__(self, root, controller):
+        self.root = root
+        self.frame = Frame(root, bg="white")
+
+        # Create three buttons with sample commands (replace with your actual functions)
+        create_button(self.frame, "Record Data", lambda: controller.show('record'))
+        create_button(self.frame, "Manage Data", lambda: controller.show('manage'))
+        create_button(self.frame, "Games", lambda: controller.show('games'))
+
+    def show(self):
+        self.root.title("Game Launcher")
+        self.root.geometry("200x300")
+
+    def hide(self):
+        pass
+
+    def close(self):
+        pass
+
+class ScreenController:
+    """Owns the one Tk root, OnlineDataHandler, RecordingCatalog and ClassifierService and swaps screens in place.
+
+    Every screen is a frame built once and kept, so returning to it is instant. Screens
+    provide show() and hide(), called as they are swapped in and out, and close(),
+    called when the application exits. Closing the window returns to the menu, or quits
+    from the menu. The classifier is stopped only then, so it survives every game and screen.
+    """
+    def __init__(self, odh, sample_rate=MYO_SAMPLE_RATE):
+        self.odh = odh
+        # EMG rate of the device behind odh, for the screens that size buffers and plots by it
+        self.sample_rate = sample_rate
+        self.classifier_service = ClassifierService(odh)
+        # Every screen and the training thread share one catalog, so none of them can go stale
+        self.catalog = RecordingCatalog('Data')
+        self.root = Tk()
+        self.root.configure(bg="white")
+        self.root.attributes("-topmost", True)
+        self.root.protocol("WM_DELETE_WINDOW", self.back)
+        self.factories = {
+            'menu': lambda: MainMenu(self.root, self),
+            'record': lambda: DataCollectionApp(self.root, self.odh, self.catalog, self.sample_rate),
+            'manage': lambda: GestureApp(self.root, self.odh, self.catalog),
+            'games': lambda: GameViewer(self.root, self.odh, self.classifier_service, self.catalog, self.sample_rate),
+        }
+        self.screens = {}
+        self.current = None
+
+    def show(self, name):
+        if self.current is not None:
+            self.current.hide()
+            self.current.frame.pack_forget()
+        if name not in self.screens:
+            self.screens[name] = self.factories[name]()
+        self.current = self.screens[name]
+        self.current.frame.pack(fill="both", expand=True)
+        self.current.show()
+        self.root.focus_force()
+
+    def back(self):
+        if self.current is self.screens.get('menu'):
+            self.quit()
+        else:
+            self.show('menu')
+
+    def quit(self):
+        self.current.hide()
+        for screen in self.screens.values():
+            screen.close()
+        self.classifier_service.stop()
+        self.root.destroy()
+
+    def run(self):
+        self.show('menu')
+        self.root.mainloop()
+
+def main(odh = None, sample_rate = MYO_SAMPLE_RATE):
+    """Runs the application on `odh`, streaming from a Myo armband if none is given.
+
+    A handler for another device must come with that device's EMG `sample_rate`.
+    """
     if odh is None:
         str, smm = libemg.streamers.myo_streamer()
         odh = libemg.data_handler.OnlineDataHandler(smm)
+        sample_rate = MYO_SAMPLE_RATE
 
-    root = Tk()
-    root.title("Game Launcher")
-    root.geometry("200x300")
-    root.configure(bg="white")
-    root.attributes("-topmost", True)
-    root.focus_force() 
-
-    # Create three buttons with sample commands (replace with your actual functions)
-    create_button(root, "Record Data", lambda: [root.destroy(), collect_data(odh)])
-    create_button(root, "Manage Data", lambda: [root.destroy(), view_data(odh)])
-    create_button(root, "Games", lambda: [root.destroy(), launch_game_viewer(odh)])
-
-    root.mainloop()
+    ScreenController(odh, sample_rate).run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,58 @@
+import os
+import hashlib
+import numpy as np
+from RecordingIO import load_recording, atomic_write
+from Downsample import minmax_envelope
+
+PREVIEW_POINTS = 200
+
+class PreviewCache:
+    """On-disk cache of decimated min/max envelopes used to draw recording thumbnails.
+
+    Each recording gets one small .npz file under <folder>/.cache/previews, named by a
+    hash of its path and stamped with the recording's mtime and size. A preview whose
+    stamp no longer matches the file is rebuilt the next time it is asked for.
+    """
+    def __init__(self, folder='Data', points=PREVIEW_POINTS):
+        self.folder = os.path.join(folder, '.cache', 'previews')
+        self.points = points
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+
+    def cache_path(self, path):
+        key = hashlib.sha1(os.path.normpath(path).encode('utf-8')).hexdigest()
+        return os.path.join(self.folder, key + '.npz')
+
+    def get(self, path):
+        """Returns (low, high) for a recording, building and storing the preview if it is missing or stale."""
+        stat = os.stat(path)
+        try:
+            with np.load(self.cache_path(path)) as cached:
+                if cached['mtime'] == stat.st_mtime_ns and cached['size'] == stat.st_size and cached['points'] == self.points:
+                    return cached['low'], cached['high']
+        except (OSError, KeyError, ValueError):
+            pass
+        return self.update(path, stat)
+
+    def update(self, path, stat=None):
+        """(Re)builds the preview for a recording, e.g. right after it has been saved."""
+        stat = stat or os.stat(path)
+        low, high = minmax_envelope(load_recording(path), self.points)
+        cache_path = self.cache_path(path)
+        atomic_write(cache_path, lambda f: np.savez(f, low=low, high=high, mtime=stat.st_mtime_ns,
+                                                    size=stat.st_size, points=self.points))
+        return low, high
+
+    def remove(self, path):
+        cache_path = self.cache_path(path)
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+
+    def prune(self, paths):
+        """Deletes previews of recordings that are no longer in `paths`."""
+        keep = set(os.path.basename(self.cache_path(p)) for p in paths)
+        for filename in os.listdir(self.folder):
+            # A .tmp file is a preview another thread is still writing
+            if filename.endswith('.tmp') or filename in keep:
+                continue
+            os.remove(os.path.join(self.folder, filename))
@@ -0,0 +1,120 @@
+import time
+import numpy as np
+from Recorder import RecordingBuffer, AcquisitionThread, SignalQuality
+from RecordingIO import create_writer
+
+class ProtocolRunner:
+    """Runs a scripted recording session on top of a DataCollectionApp.
+
+    The protocol is a list of (gesture, reps, hold time, rest time) steps. The whole
+    session is acquired as one continuous stream; every hold is cut out of that stream
+    and saved as its own labelled recording, while rests are discarded.
+
+    Holds are cut by sample index (schedule time x sample rate from the start of
+    acquisition), not by when the UI tick runs, so a stalled UI cannot shift the labels.
+    """
+    def __init__(self, app, steps, lead_in=3, tick=50, grace=2):
+        self.app = app
+        self.tick_ms = tick
+        # How long past the end of the schedule to wait for the last samples to arrive
+        self.grace = grace
+        self.after_id = None
+        self.acquisition = None
+
+        # Expand the steps into a flat schedule of (phase, gesture, start, end) in seconds
+        self.schedule = []
+        t = 0
+        for gesture, reps, hold_time, rest_time in steps:
+            for _ in range(reps):
+                rest = rest_time if self.schedule else lead_in
+                self.schedule.append(('rest', gesture, t, t + rest))
+                self.schedule.append(('hold', gesture, t + rest, t + rest + hold_time))
+                t += rest + hold_time
+        self.total_time = t
+        self.holds = [phase for phase in self.schedule if phase[0] == 'hold']
+
+    def start(self):
+        self.data = RecordingBuffer(self.app.sample_rate, self.total_time)
+        self.app.quality = SignalQuality(self.app.sample_rate)
+        self.timestamps = []
+        self.acquisition = AcquisitionThread(self.app.odh, self.data, self.on_chunk, self.app.poll_interval, self.app.quality)
+        self.acquisition.start()
+        self.start_time = time.time()
+        self.index = 0
+        self.next_hold = 0
+        self.tick()
+
+    def stop(self):
+        """Stops the session early. Holds that already finished stay saved."""
+        if self.after_id:
+            self.app.root.after_cancel(self.after_id)
+            self.after_id = None
+        if self.acquisition is not None:
+            self.acquisition.stop()
+            self.save_holds(self.acquisition.snapshot()['samples'])
+
+    def on_chunk(self, samples, timestamp):
+        # Runs on the acquisition thread; the session is short enough to keep every chunk time
+        self.timestamps.append((timestamp, self.acquisition.samples_pulled))
+
+    @property
+    def running(self):
+        return self.after_id is not None
+
+    def sample_range(self, phase):
+        """The [start, end) sample indices of a scheduled phase in the acquired stream."""
+        return round(phase[2] * self.app.sample_rate), round(phase[3] * self.app.sample_rate)
+
+    def save_holds(self, samples):
+        """Saves every hold that lies entirely within the first `samples` samples and has not been saved."""
+        while self.next_hold < len(self.holds) and self.sample_range(self.holds[self.next_hold])[1] <= samples:
+            self.save_hold(self.holds[self.next_hold])
+            self.next_hold += 1
+
+    def tick(self):
+        elapsed = time.time() - self.start_time
+        self.save_holds(self.acquisition.snapshot()['samples'])
+        # The prompt follows the clock; only the cutting follows the samples
+        while self.index < len(self.schedule) and elapsed >= self.schedule[self.index][3]:
+            self.index += 1
+
+        if self.index >= len(self.schedule):
+            if self.next_hold < len(self.holds) and elapsed < self.total_time + self.grace:
+                # The last samples are still on their way
+                self.after_id = self.app.root.after(self.tick_ms, self.tick)
+                return
+            self.after_id = None
+            self.acquisition.stop()
+            self.save_holds(self.acquisition.snapshot()['samples'])
+            if self.next_hold < len(self.holds):
+                print(f"Dropping {len(self.holds) - self.next_hold} hold(s): their samples never arrived")
+            self.app.protocol_finished()
+            return
+
+        phase, gesture, start, end = self.schedule[self.index]
+        if self.app.gesture_var.get() != gesture:
+            self.app.gesture_var.set(gesture)
+        self.app.draw_progress(100 * elapsed / self.total_time)
+        self.app.draw_quality(self.acquisition.snapshot()['quality'])
+        self.app.progress_label.configure(text=f"{'Hold' if phase == 'hold' else 'Rest'} {end - elapsed:.0f}s")
+        self.after_id = self.app.root.after(self.tick_ms, self.tick)
+
+    def save_hold(self, phase):
+        gesture = phase[1]
+        hold_start, hold_end = self.sample_range(phase)
+        segment = self.acquisition.segment(hold_start, hold_end)
+        if segment.shape[0] == 0:
+            return
+        timestamps = np.array(self.timestamps[:], dtype=np.float64).reshape(-1, 2)
+        timestamps = timestamps[(timestamps[:, 1] > hold_start) & (timestamps[:, 1] <= hold_end)]
+        timestamps[:, 1] -= hold_start
+
+        quality = SignalQuality(self.app.sample_rate)
+        quality.update(segment)
+
+        rep = self.app.catalog.next_rep(gesture)
+        timestamp = self.start_time + phase[2]
+        writer = create_writer(self.app.recording_path(gesture, rep, timestamp), timestamps=True)
+        self.app.saver.submit(writer.append, segment)
+        self.app.saver.submit(writer.mark, timestamps[:, 0], timestamps[:, 1])
+        self.app.saver.submit(self.app.save_recording, writer, gesture, rep, timestamp, quality.summary(), notify=gesture)
@@ -0,0 +1,281 @@
+import time
+import threading
+import numpy as np
+
+class RecordingBuffer:
+    """Preallocated sample buffer for a single recording.
+
+    Samples are appended into a block sized from the sample rate and the expected
+    recording length. If a recording runs long the block doubles in size, so appends
+    stay amortized O(1) and the final array is handed over as a view (no copy).
+    """
+    def __init__(self, sample_rate=200, duration=5, num_channels=None, dtype=np.float64):
+        # A little headroom so a recording that runs slightly over never has to grow
+        self.capacity = max(1, int(np.ceil(sample_rate * duration * 1.25)))
+        self.num_channels = num_channels
+        self.dtype = dtype
+        self.length = 0
+        self.buffer = None
+        if num_channels is not None:
+            self.buffer = np.empty((self.capacity, num_channels), dtype=dtype)
+
+    def __len__(self):
+        return self.length
+
+    def append(self, samples):
+        """Copy a (samples x channels) chunk onto the end of the buffer."""
+        samples = np.asarray(samples)
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        n = samples.shape[0]
+        if n == 0:
+            return
+        # The channel count is only known once the first chunk arrives
+        if self.buffer is None:
+            self.num_channels = samples.shape[1]
+            self.buffer = np.empty((self.capacity, self.num_channels), dtype=self.dtype)
+        if self.length + n > self.capacity:
+            self._grow(self.length + n)
+        self.buffer[self.length:self.length + n] = samples
+        self.length += n
+
+    def _grow(self, required):
+        while self.capacity < required:
+            self.capacity *= 2
+        grown = np.empty((self.capacity, self.num_channels), dtype=self.dtype)
+        grown[:self.length] = self.buffer[:self.length]
+        self.buffer = grown
+
+    def get_data(self):
+        """Returns the recorded samples as a view into the buffer."""
+        if self.buffer is None:
+            return np.empty((0, self.num_channels or 0), dtype=self.dtype)
+        return self.buffer[:self.length]
+
+class ChunkedBuffer:
+    """Bounded-memory stand-in for RecordingBuffer, for sessions of unknown length.
+
+    Samples fill one preallocated fixed-size chunk. Each full chunk is handed to
+    `on_chunk_full` (normally queued for the disk writer) and a fresh chunk is started,
+    so memory stays constant no matter how long the session runs.
+    """
+    def __init__(self, chunk_samples, on_chunk_full, dtype=np.float64):
+        self.chunk_samples = chunk_samples
+        self.on_chunk_full = on_chunk_full
+        self.dtype = dtype
+        self.chunk = None
+        self.fill = 0
+        self.total = 0
+
+    def __len__(self):
+        return self.total
+
+    def append(self, samples):
+        samples = np.asarray(samples)
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        while samples.shape[0] > 0:
+            if self.chunk is None:
+                self.chunk = np.empty((self.chunk_samples, samples.shape[1]), dtype=self.dtype)
+            n = min(samples.shape[0], self.chunk_samples - self.fill)
+            self.chunk[self.fill:self.fill + n] = samples[:n]
+            self.fill += n
+            self.total += n
+            samples = samples[n:]
+            if self.fill == self.chunk_samples:
+                self.flush()
+
+    def flush(self):
+        """Hands over the current (possibly partial) chunk."""
+        if self.chunk is not None and self.fill > 0:
+            self.on_chunk_full(self.chunk[:self.fill])
+        self.chunk = None
+        self.fill = 0
+
+    def get_data(self):
+        """Returns only the samples of the chunk currently being filled."""
+        if self.chunk is None:
+            return np.empty((0, 0), dtype=self.dtype)
+        return self.chunk[:self.fill]
+
+class AcquisitionThread:
+    """Drains an OnlineDataHandler into a RecordingBuffer on a dedicated thread.
+
+    The handler is polled every `interval` seconds independent of the Tk event loop,
+    so UI stalls no longer risk overrunning the online buffer. Each new chunk is also
+    folded into the optional SignalQuality and passed to `on_chunk(samples, timestamp)`
+    (e.g. to queue it for the disk writer).
+    The UI should only read state through snapshot().
+
+    The handler is never reset: new samples are found from how far its running count
+    has moved since the last poll, so nothing that arrives during a poll is lost and the
+    online classifier, which reads the same count, keeps running undisturbed.
+    """
+    def __init__(self, odh, buffer, on_chunk=None, interval=0.02, quality=None):
+        self.odh = odh
+        self.buffer = buffer
+        self.quality = quality
+        self.on_chunk = on_chunk
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+        # Counters
+        self.samples_pulled = 0
+        self.polls = 0
+        self.max_gap = 0
+        self.last_poll = None
+        self.last_count = None
+
+    def start(self):
+        # Only samples arriving from now on belong to this recording
+        self.last_count = self.read()[1]
+        self.thread.start()
+
+    def stop(self):
+        """Stops polling and drains whatever arrived since the last poll."""
+        if self.thread.is_alive():
+            self.stop_event.set()
+            self.thread.join()
+            self.poll()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.poll()
+
+    def read(self):
+        """Returns (newest-first EMG buffer, running sample count) read consistently."""
+        # The buffer and its count are separate shared variables, so retry if a sample
+        # lands between reading the two
+        for _ in range(5):
+            before = int(self.odh.smm.get_variable('emg_count')[0][0])
+            new_data, amount = self.odh.get_data()
+            count = int(amount['emg'][0][0])
+            if count == before:
+                break
+        return new_data['emg'], count
+
+    def poll(self):
+        now = time.time()
+        data, count = self.read()
+        num_samples = count - self.last_count
+        if num_samples < 0:
+            # Someone else reset the handler; everything it holds now is new
+            num_samples = count
+        num_samples = min(num_samples, data.shape[0])
+        self.last_count = count
+        samples = None
+        if num_samples > 0:
+            # libemg keeps the newest sample first
+            samples = data[:num_samples][::-1]
+
+        with self.lock:
+            if samples is not None:
+                self.buffer.append(samples)
+                if self.quality is not None:
+                    self.quality.update(samples, now)
+                self.samples_pulled += num_samples
+            if self.last_poll is not None:
+                self.max_gap = max(self.max_gap, now - self.last_poll)
+            self.last_poll = now
+            self.polls += 1
+        if samples is not None and self.on_chunk is not None:
+            self.on_chunk(samples, now)
+
+    def segment(self, start, end):
+        """Returns a copy of samples [start, end) of the recording so far."""
+        with self.lock:
+            return np.array(self.buffer.get_data()[start:end])
+
+    def snapshot(self):
+        """Returns a consistent copy of the acquisition counters for display."""
+        with self.lock:
+            return {
+                'samples': len(self.buffer),
+                'samples_pulled': self.samples_pulled,
+                'polls': self.polls,
+                'max_gap': self.max_gap,
+                'quality': self.quality.summary() if self.quality is not None else None,
+            }
+
+class SignalQuality:
+    """Running per-channel signal quality statistics.
+
+    update() only looks at the new chunk, so the cost per chunk is O(chunk) no matter
+    how long the recording is. Tracks RMS, mean absolute value, clipped samples, the
+    longest flat-line run and an estimate of samples dropped between chunks.
+    """
+    def __init__(self, sample_rate=200, clip_level=127, flat_samples=50):
+        self.sample_rate = sample_rate
+        self.clip_level = clip_level
+        self.flat_samples = flat_samples
+        self.count = 0
+        self.sum_sq = None
+        self.sum_abs = None
+        self.clipped = None
+        self.run = None
+        self.longest_run = None
+        self.last = None
+        self.first_time = None
+        self.first_count = 0
+        self.last_time = None
+
+    def update(self, samples, timestamp=None):
+        x = np.asarray(samples, dtype=np.float64)
+        if x.ndim == 1:
+            x = x[:, None]
+        n = x.shape[0]
+        if n == 0:
+            return
+        if self.sum_sq is None:
+            channels = x.shape[1]
+            self.sum_sq = np.zeros(channels)
+            self.sum_abs = np.zeros(channels)
+            self.clipped = np.zeros(channels, dtype=int)
+            self.run = np.zeros(channels, dtype=int)
+            self.longest_run = np.zeros(channels, dtype=int)
+
+        abs_x = np.abs(x)
+        self.sum_sq += np.sum(x * x, axis=0)
+        self.sum_abs += np.sum(abs_x, axis=0)
+        self.clipped += np.sum(abs_x >= self.clip_level, axis=0)
+
+        # Flat-line runs: a run restarts wherever a sample differs from the one before it,
+        # and a run still open at the end of the previous chunk carries over into this one
+        same = np.empty(x.shape, dtype=bool)
+        same[0] = x[0] == self.last if self.last is not None else False
+        same[1:] = x[1:] == x[:-1]
+        idx = np.arange(1, n + 1)[:, None]
+        last_reset = np.maximum.accumulate(np.where(same, 0, idx), axis=0)
+        runs = np.where(last_reset > 0, idx - last_reset + 1, self.run + idx)
+        self.longest_run = np.maximum(self.longest_run, runs.max(axis=0))
+        self.run = runs[-1]
+        self.last = x[-1]
+
+        if timestamp is not None:
+            if self.first_time is None:
+                self.first_time = timestamp
+                self.first_count = n
+            self.last_time = timestamp
+        self.count += n
+
+    def dropped_samples(self):
+        """Samples expected from the sample rate between the first and last chunk but never received."""
+        if self.first_time is None or self.last_time == self.first_time:
+            return None
+        expected = (self.last_time - self.first_time) * self.sample_rate
+        return max(0, int(round(expected - (self.count - self.first_count))))
+
+    def summary(self):
+        """Returns the statistics as plain Python types so they can be stored as JSON metadata."""
+        if self.count == 0:
+            return None
+        return {
+            'rms': np.sqrt(self.sum_sq / self.count).round(3).tolist(),
+            'mav': (self.sum_abs / self.count).round(3).tolist(),
+            'clipped': self.clipped.tolist(),
+            'longest_flat_run': self.longest_run.tolist(),
+            'flat': (self.longest_run >= self.flat_samples).tolist(),
+            'dropped': self.dropped_samples(),
+        }
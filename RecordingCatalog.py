@@ -0,0 +1,170 @@
+import os
+import json
+import threading
+from RecordingIO import load_recording, load_recordings, list_recordings
+
+CATALOG_FILE = 'catalog.jsonl'
+
+def _read_shape(path):
+    # Errors are handed back rather than raised so one bad file does not stop the import
+    try:
+        return load_recording(path).shape
+    except ValueError as e:
+        return e
+
+class RecordingCatalog:
+    """Append-only JSON-lines manifest of every recording in a data folder.
+
+    Each line is either a recording entry (class, rep, timestamp, samples, channels,
+    sample_rate, path) or a {"deleted": path} tombstone. The whole log is read once
+    into memory; lookups after that never touch the folder.
+
+    The application shares one instance between its screens and threads. refresh() only
+    reads complete lines, and reloads from the start if the file has shrunk or been
+    replaced since the last read (e.g. compacted by another process).
+    """
+    def __init__(self, folder='Data'):
+        self.folder = folder
+        self.path = os.path.join(folder, CATALOG_FILE)
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.next_reps = {}
+        self.offset = 0
+        self.identity = None
+        self.dead_lines = 0
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        if os.path.exists(self.path):
+            self.refresh()
+            if self.dead_lines > len(self.entries):
+                self.compact()
+        else:
+            self._import_legacy()
+
+    def _apply(self, record):
+        if 'deleted' in record:
+            if self.entries.pop(record['deleted'], None) is not None:
+                self.dead_lines += 2
+        else:
+            self.entries[record['path']] = record
+            self.next_reps[record['class']] = max(self.next_reps.get(record['class'], 0), record['rep'] + 1)
+
+    def _write(self, record):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        # Read the line back, so the offset stays at the end of what has been applied
+        self._read()
+
+    def _identity(self, stat):
+        return (stat.st_dev, stat.st_ino)
+
+    def _read(self):
+        stat = os.stat(self.path)
+        handed_out = {}
+        if self._identity(stat) != self.identity or stat.st_size < self.offset:
+            # Rewritten or truncated elsewhere: start over, but never hand out a rep number twice
+            handed_out = self.next_reps
+            self.entries = {}
+            self.next_reps = {}
+            self.dead_lines = 0
+            self.offset = 0
+            self.identity = self._identity(stat)
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+        # A last line without its newline is still being written; it is read next time
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode('utf-8').splitlines():
+            if line.strip():
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError) as e:
+                    print("Skipping a corrupt catalog line:", e)
+        self.offset += end
+        for gesture, rep in handed_out.items():
+            self.next_reps[gesture] = max(self.next_reps.get(gesture, 0), rep)
+
+    def _import_legacy(self):
+        # Recordings made before the catalog existed only carry their metadata in the filename
+        paths = [os.path.join(self.folder, f).replace('\\', '/') for f in list_recordings(self.folder)]
+        shapes = {}
+        for i, path, shape in load_recordings(paths, _read_shape):
+            shapes[path] = shape
+        for path in paths:
+            filename = os.path.basename(path)
+            try:
+                if isinstance(shapes[path], Exception):
+                    raise shapes[path]
+                parts = os.path.splitext(filename)[0].split('_')
+                self.add(path, parts[1], int(parts[3]), float(parts[5]), shapes[path][0], shapes[path][1], None)
+            except (IndexError, ValueError) as e:
+                print(f"Skipping {filename} while building the catalog:", e)
+        if not os.path.exists(self.path):
+            open(self.path, 'a').close()
+
+    def refresh(self):
+        """Reads entries appended to the log since the last read (e.g. by another window)."""
+        with self.lock:
+            self._read()
+
+    def compact(self):
+        """Rewrites the log without deleted entries."""
+        with self.lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry) + '\n')
+            os.replace(tmp_path, self.path)
+            stat = os.stat(self.path)
+            self.offset = stat.st_size
+            self.identity = self._identity(stat)
+            self.dead_lines = 0
+
+    def next_rep(self, gesture):
+        """Hands out the next rep number for a gesture."""
+        with self.lock:
+            rep = self.next_reps.get(gesture, 0)
+            self.next_reps[gesture] = rep + 1
+            return rep
+
+    def release_rep(self, gesture, rep):
+        """Gives back a rep number handed out for a recording that was cancelled."""
+        with self.lock:
+            if self.next_reps.get(gesture) == rep + 1:
+                self.next_reps[gesture] = rep
+
+    def add(self, path, gesture, rep, timestamp, samples, channels, sample_rate, **metadata):
+        entry = {
+            'class': gesture,
+            'rep': rep,
+            'timestamp': timestamp,
+            'samples': samples,
+            'channels': channels,
+            'sample_rate': sample_rate,
+            'path': path,
+        }
+        entry.update(metadata)
+        with self.lock:
+            self._write(entry)
+        return entry
+
+    def remove(self, path):
+        with self.lock:
+            if path in self.entries:
+                self._write({'deleted': path})
+
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+            self.next_reps = {}
+            self.dead_lines = 0
+            open(self.path, 'w').close()
+            self.offset = 0
+            self.identity = self._identity(os.stat(self.path))
+
+    def recordings(self, classes=None):
+        """Returns catalog entries in the order they were recorded, optionally limited to some classes."""
+        with self.lock:
+            if classes is None:
+                return list(self.entries.values())
+            return [e for e in self.entries.values() if e['class'] in classes]
@@ -0,0 +1,461 @@
+import os
+import queue
+import lzma
+import zlib
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+
+# Every recording header is padded to the same size so the row count can be
+# rewritten in place once the recording is finished.
+HEADER_SIZE = 128
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+COMPRESSED_MAGIC = b'EMGZ'
+RECORDING_EXTENSIONS = ('.npy', '.emgz', '.csv')
+CODECS = {'zlib': 0, 'lzma': 1}
+# Storage backend for new recordings: 'npy' (raw float32), or 'zlib' / 'lzma' for
+# compressed .emgz files. Chosen per install through the environment.
+RECORDING_FORMAT = os.environ.get('EMG_RECORDING_FORMAT', 'npy')
+# Side file holding one (host time, sample index) row per acquired chunk
+TIMESTAMPS_EXTENSION = '.ts'
+
+# Reads are mostly file I/O and decompression, which release the GIL, so threads scale with cores
+LOADER_WORKERS = min(8, os.cpu_count() or 1)
+
+def timestamps_path(path):
+    return os.path.splitext(path)[0] + TIMESTAMPS_EXTENSION
+
+def atomic_write(path, write):
+    """Writes a file through write(f) under a temporary name, then moves it into place.
+
+    Readers never see a half-written file, and the temporary name is per thread so
+    concurrent writers of the same file cannot trip over each other's.
+    """
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+def _npy_header(rows, cols, dtype):
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d, %d), }" % (np.dtype(dtype).str, rows, cols)
+    header = header.ljust(HEADER_SIZE - len(NPY_MAGIC) - 2 - 1) + "\n"
+    return NPY_MAGIC + struct.pack('<H', len(header)) + header.encode('latin1')
+
+class TimestampedWriter:
+    """Base for the writers: records chunk arrival times in the optional timestamps side file."""
+    def mark(self, timestamp, index):
+        """Record that the samples before `index` had arrived by host time `timestamp` (scalars or arrays)."""
+        if self.timestamps is not None:
+            self.timestamps.append(np.column_stack([np.atleast_1d(timestamp), np.atleast_1d(index)]))
+
+class FileWriter(TimestampedWriter):
+    """Base for writers of a single recording file at self.path, opened on the first append."""
+    def _open(self):
+        # Opened lazily so constructing a writer never touches the disk
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        self.file = open(self.path, 'wb')
+
+    def discard(self):
+        """Close and delete the file (e.g. when a recording is cancelled)."""
+        if self.file is not None:
+            self.file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        if self.timestamps is not None:
+            self.timestamps.discard()
+
+class RecordingWriter(FileWriter):
+    """Streams samples to an append-only .npy file while a recording runs.
+
+    The header is written with a row count of zero and fixed up on close, so the
+    file is a regular .npy that np.load (and load_recording) can memory-map.
+    With timestamps=True, the host time of every chunk is written to a side file as
+    (time, index of the sample after the chunk) rows.
+    """
+    def __init__(self, path, dtype=np.float32, timestamps=False):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.num_channels = None
+        self.rows = 0
+        self.file = None
+        self.timestamps = RecordingWriter(timestamps_path(path), np.float64) if timestamps else None
+
+    def append(self, samples, timestamp=None):
+        """Write a (samples x channels) chunk to the end of the file."""
+        samples = np.asarray(samples, dtype=self.dtype)
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        if self.file is None:
+            self._open()
+        if self.num_channels is None:
+            self.num_channels = samples.shape[1]
+            self.file.write(_npy_header(0, self.num_channels, self.dtype))
+        self.file.write(np.ascontiguousarray(samples).tobytes())
+        self.rows += samples.shape[0]
+        if timestamp is not None:
+            self.mark(timestamp, self.rows)
+
+    def close(self):
+        """Fix up the header with the final shape and close the file."""
+        if self.file is None:
+            self._open()
+        if self.file.closed:
+            return self.path
+        self.file.seek(0)
+        self.file.write(_npy_header(self.rows, self.num_channels or 0, self.dtype))
+        self.file.close()
+        if self.timestamps is not None and self.timestamps.file is not None:
+            self.timestamps.close()
+        return self.path
+
+class CompressedRecordingWriter(FileWriter):
+    """Streams samples to a compressed .emgz file.
+
+    Samples are collected into blocks of `block_samples` rows and each block is
+    delta-encoded along time and compressed with zlib or lzma. Blocks whose values are
+    whole numbers (e.g. Myo int8 EMG) are stored losslessly as int16 deltas, anything
+    else falls back to float32. Blocks decode independently, so the file can be streamed.
+    """
+    def __init__(self, path, codec='zlib', block_samples=1000, timestamps=False):
+        self.path = path
+        self.codec = codec
+        self.block_samples = block_samples
+        self.num_channels = None
+        self.rows = 0
+        self.file = None
+        self.pending = []
+        self.pending_rows = 0
+        self.timestamps = RecordingWriter(timestamps_path(path), np.float64) if timestamps else None
+
+    def append(self, samples, timestamp=None):
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        if self.file is None:
+            self._open()
+        if self.num_channels is None:
+            self.num_channels = samples.shape[1]
+            self.file.write(COMPRESSED_MAGIC + struct.pack('<BBH', 1, CODECS[self.codec], self.num_channels))
+        self.pending.append(samples)
+        self.pending_rows += samples.shape[0]
+        self.rows += samples.shape[0]
+        if self.pending_rows >= self.block_samples:
+            self._write_block()
+        if timestamp is not None:
+            self.mark(timestamp, self.rows)
+
+    def _write_block(self):
+        if self.pending_rows == 0:
+            return
+        block = np.vstack(self.pending)
+        self.pending = []
+        self.pending_rows = 0
+        delta = np.diff(block, axis=0, prepend=np.zeros((1, block.shape[1]), dtype=block.dtype))
+        if np.all(block == np.round(block)) and np.all(np.abs(delta) <= np.iinfo(np.int16).max):
+            encoding, payload = 0, delta.astype('<i2').tobytes()
+        else:
+            encoding, payload = 1, block.astype('<f4').tobytes()
+        if self.codec == 'lzma':
+            payload = lzma.compress(payload)
+        else:
+            payload = zlib.compress(payload, 6)
+        self.file.write(struct.pack('<BII', encoding, block.shape[0], len(payload)))
+        self.file.write(payload)
+
+    def close(self):
+        if self.file is None:
+            self._open()
+        if self.file.closed:
+            return self.path
+        self._write_block()
+        self.file.close()
+        if self.timestamps is not None and self.timestamps.file is not None:
+            self.timestamps.close()
+        return self.path
+
+def recording_extension(recording_format=None):
+    return '.npy' if (recording_format or RECORDING_FORMAT) == 'npy' else '.emgz'
+
+def create_writer(path, timestamps=False, recording_format=None):
+    """Creates a writer for the configured storage backend, matching the path's extension."""
+    recording_format = recording_format or RECORDING_FORMAT
+    if path.endswith('.emgz'):
+        return CompressedRecordingWriter(path, codec='lzma' if recording_format == 'lzma' else 'zlib', timestamps=timestamps)
+    return RecordingWriter(path, timestamps=timestamps)
+
+class RotatingRecordingWriter(TimestampedWriter):
+    """Writes one long session as a series of part files.
+
+    A new part is started every `max_samples_per_file` samples (never, if None).
+    `on_part_closed(path, part, writer)` is called as each part is finished.
+    Timestamps, if enabled, go to one side file for the whole session (next to the
+    first part) and index samples across all parts.
+    """
+    def __init__(self, path_for_part, max_samples_per_file=None, on_part_closed=None, timestamps=False):
+        self.path_for_part = path_for_part
+        self.max_samples_per_file = max_samples_per_file
+        self.on_part_closed = on_part_closed
+        self.writer = None
+        self.part = 0
+        self.paths = []
+        self.timestamps = RecordingWriter(timestamps_path(path_for_part(0)), np.float64) if timestamps else None
+
+    def append(self, samples):
+        samples = np.asarray(samples)
+        while samples.shape[0] > 0:
+            if self.writer is None:
+                self.writer = create_writer(self.path_for_part(self.part))
+            if self.max_samples_per_file is None:
+                room = samples.shape[0]
+            else:
+                room = self.max_samples_per_file - self.writer.rows
+            self.writer.append(samples[:room])
+            samples = samples[room:]
+            if self.max_samples_per_file is not None and self.writer.rows >= self.max_samples_per_file:
+                self._close_part()
+
+    def _close_part(self):
+        path = self.writer.close()
+        self.paths.append(path)
+        if self.on_part_closed is not None:
+            self.on_part_closed(path, self.part, self.writer)
+        self.writer = None
+        self.part += 1
+
+    def close(self):
+        """Finishes the last part and returns the paths of every part."""
+        if self.writer is not None and self.writer.rows > 0:
+            self._close_part()
+        elif self.writer is not None:
+            self.writer.discard()
+            self.writer = None
+        if self.timestamps is not None and self.timestamps.file is not None:
+            self.timestamps.close()
+        return self.paths
+
+class BackgroundWriter:
+    """Runs recording I/O on a dedicated thread so the Tk event loop never blocks on disk.
+
+    Jobs are queued with submit (the queue is bounded, so a stalled disk applies
+    back-pressure instead of growing memory). Jobs submitted with a notify label
+    report back through poll_completed, which the UI calls from its own thread.
+    """
+    def __init__(self, max_queue=256):
+        self.jobs = queue.Queue(maxsize=max_queue)
+        self.completed = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+            fn, args, notify = job
+            try:
+                result = fn(*args)
+                if notify is not None:
+                    self.completed.put((notify, result, None))
+            except Exception as e:
+                self.completed.put((notify, None, e))
+            finally:
+                self.jobs.task_done()
+
+    def submit(self, fn, *args, notify=None):
+        self.jobs.put((fn, args, notify))
+
+    def poll_completed(self):
+        """Returns the (notify, result, error) tuples of jobs finished since the last poll."""
+        done = []
+        while True:
+            try:
+                done.append(self.completed.get_nowait())
+            except queue.Empty:
+                return done
+
+    def flush(self):
+        """Blocks until every queued job has been written."""
+        self.jobs.join()
+
+    def close(self):
+        """Flushes the queue and stops the writer thread."""
+        self.jobs.put(None)
+        self.thread.join()
+
+def load_recording(path, mmap=True):
+    """Loads a recording as a (samples x channels) array.
+
+    Binary recordings are memory-mapped. The row count is recovered from the file
+    size, so a recording whose header was never fixed up (e.g. after a crash) still loads.
+    """
+    if path.endswith('.csv'):
+        data = np.loadtxt(path, delimiter=",", ndmin=2)
+        return data
+    if path.endswith('.emgz'):
+        return _load_compressed(path)
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    cols = shape[1] if len(shape) > 1 else 1
+    rows = (os.path.getsize(path) - offset) // (dtype.itemsize * cols) if cols else 0
+    if rows == 0:
+        return np.empty((0, cols), dtype=dtype)
+    if mmap:
+        return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(rows, cols))
+    return np.fromfile(path, dtype=dtype, count=rows * cols, offset=offset).reshape(rows, cols)
+
+class RecordingLoader:
+    """Bounded thread pool for reading and parsing recordings concurrently."""
+    def __init__(self, max_workers=None):
+        self.pool = ThreadPoolExecutor(max_workers or LOADER_WORKERS)
+
+    def submit(self, fn, path):
+        return self.pool.submit(fn, path)
+
+    def map_unordered(self, paths, fn=load_recording):
+        """Yields (index, path, result) for every path as soon as it has been read, in completion order."""
+        futures = {self.pool.submit(fn, path): i for i, path in enumerate(paths)}
+        for future in as_completed(futures):
+            i = futures[future]
+            yield i, paths[i], future.result()
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+def load_recordings(paths, fn=load_recording, max_workers=None):
+    """Reads many recordings concurrently, yielding (index, path, result) as each completes."""
+    loader = RecordingLoader(max_workers)
+    try:
+        yield from loader.map_unordered(list(paths), fn)
+    finally:
+        loader.close()
+
+def iter_recording_chunks(paths, chunk_samples=2000):
+    """Lazily yields (samples x channels) chunks from one or more recordings, in order.
+
+    Only one chunk is read into memory at a time, so arbitrarily long sessions (and
+    sessions split over several part files) can be streamed.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    for path in paths:
+        data = load_recording(path)
+        for start in range(0, data.shape[0], chunk_samples):
+            yield np.asarray(data[start:start + chunk_samples], dtype=np.float64)
+
+def iter_windows(paths, window_size, window_increment, chunk_samples=2000):
+    """Lazily yields windows (windows x channels x window_size) over one or more recordings.
+
+    Produces the same windows as libemg's get_windows / OfflineDataHandler.parse_windows
+    on the concatenated data, carrying the overlap across chunk and file boundaries.
+    """
+    carry = None
+    for chunk in iter_recording_chunks(paths, chunk_samples):
+        if carry is not None:
+            chunk = np.vstack([carry, chunk])
+        num_windows = (chunk.shape[0] - window_size) // window_increment + 1
+        if num_windows > 0:
+            starts = np.arange(num_windows) * window_increment
+            windows = chunk[starts[:, None] + np.arange(window_size)]
+            yield np.transpose(windows, (0, 2, 1))
+            carry = chunk[num_windows * window_increment:]
+        else:
+            carry = chunk
+
+def load_timestamps(path):
+    """Loads the (host time, sample index) rows stored alongside a recording, or None."""
+    if not os.path.exists(timestamps_path(path)):
+        return None
+    return load_recording(timestamps_path(path), mmap=False)
+
+def timing_report(path, sample_rate=None):
+    """Summarizes acquisition timing for a recording from its per-chunk timestamps.
+
+    Reports the effective sample rate, the distribution of gaps between chunks and,
+    if the nominal sample rate is known, an estimate of dropped samples.
+    """
+    timestamps = load_timestamps(path)
+    if timestamps is None or timestamps.shape[0] < 2:
+        return None
+    times, indices = timestamps[:, 0], timestamps[:, 1]
+    duration = times[-1] - times[0]
+    samples = indices[-1] - indices[0]
+    gaps = np.diff(times)
+    report = {
+        'chunks': int(timestamps.shape[0]),
+        'samples': int(indices[-1]),
+        'duration': float(duration),
+        'effective_rate': float(samples / duration) if duration > 0 else None,
+        'samples_per_chunk': float(np.mean(np.diff(indices))),
+        'gap_mean': float(np.mean(gaps)),
+        'gap_std': float(np.std(gaps)),
+        'gap_p50': float(np.percentile(gaps, 50)),
+        'gap_p95': float(np.percentile(gaps, 95)),
+        'gap_p99': float(np.percentile(gaps, 99)),
+        'gap_max': float(np.max(gaps)),
+    }
+    if sample_rate is not None:
+        report['dropped'] = max(0, int(round(duration * sample_rate - samples)))
+    return report
+
+def delete_recording(path):
+    """Removes a recording and its side files."""
+    for file in [path, timestamps_path(path)]:
+        if os.path.exists(file):
+            os.remove(file)
+
+def _load_compressed(path):
+    with open(path, 'rb') as f:
+        contents = f.read()
+    if len(contents) == 0:
+        return np.empty((0, 0), dtype=np.float32)
+    if contents[:4] != COMPRESSED_MAGIC:
+        raise ValueError(f"{path} is not a compressed recording")
+    version, codec, num_channels = struct.unpack_from('<BBH', contents, 4)
+    decompress = lzma.decompress if codec == CODECS['lzma'] else zlib.decompress
+    blocks = []
+    offset = 8
+    while offset < len(contents):
+        encoding, rows, size = struct.unpack_from('<BII', contents, offset)
+        offset += struct.calcsize('<BII')
+        payload = decompress(contents[offset:offset + size])
+        offset += size
+        if encoding == 0:
+            delta = np.frombuffer(payload, dtype='<i2').reshape(rows, num_channels)
+            blocks.append(np.cumsum(delta, axis=0, dtype=np.float32))
+        else:
+            blocks.append(np.frombuffer(payload, dtype='<f4').reshape(rows, num_channels))
+    if not blocks:
+        return np.empty((0, num_channels), dtype=np.float32)
+    return np.vstack(blocks)
+
+def export_csv(path, csv_path=None):
+    """Writes a recording out in the original comma-delimited text format."""
+    if csv_path is None:
+        csv_path = os.path.splitext(path)[0] + '.csv'
+    np.savetxt(csv_path, load_recording(path), delimiter=",")
+    return csv_path
+
+def list_recordings(folder):
+    return sorted(f for f in os.listdir(folder) if f.endswith(RECORDING_EXTENSIONS))
+
+if __name__ == "__main__":
+    # Print acquisition timing for recordings: python RecordingIO.py Data/*.npy
+    import sys
+    for path in sys.argv[1:]:
+        report = timing_report(path, sample_rate=200)
+        if report is None:
+            print(f"{path}: no timestamps")
+            continue
+        print(f"{path}: {report['samples']} samples in {report['duration']:.2f}s, "
+              f"{report['effective_rate']:.1f} Hz effective, {report['dropped']} dropped")
+        print(f"    gaps (ms): mean {report['gap_mean'] * 1000:.1f}, p50 {report['gap_p50'] * 1000:.1f}, "
+              f"p95 {report['gap_p95'] * 1000:.1f}, p99 {report['gap_p99'] * 1000:.1f}, max {report['gap_max'] * 1000:.1f}")
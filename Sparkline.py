@@ -0,0 +1,29 @@
+import numpy as np
+
+# matplotlib's default colour cycle, so thumbnails keep the colours the full plots use
+CHANNEL_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+                  '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+def sparkline_coords(low, high, width, height, pad=2):
+    """Turns a (points x channels) min/max envelope into one flat [x0, y0, x1, y1, ...] list per channel.
+
+    Every bin becomes a vertical stroke from its min to its max, and all channels share
+    one y scale so they overlay like ax.plot(data) does.
+    """
+    points, channels = low.shape
+    if points == 0:
+        return []
+    top, bottom = min(low.min(), high.min()), max(low.max(), high.max())
+    span = (bottom - top) or 1
+    x = np.repeat(np.linspace(pad, width - pad, points), 2)
+    trace = np.empty((points * 2, channels), dtype=np.float64)
+    trace[0::2] = low
+    trace[1::2] = high
+    y = pad + (bottom - trace) / span * (height - 2 * pad)
+    return [np.column_stack([x, y[:, c]]).ravel().tolist() for c in range(channels)]
+
+def draw_sparkline(canvas, low, high, width, height, line_width=1):
+    """Draws a recording's envelope as one polyline per channel on a Tk canvas, replacing what was there."""
+    canvas.delete("all")
+    for c, coords in enumerate(sparkline_coords(low, high, width, height)):
+        canvas.create_line(*coords, fill=CHANNEL_COLORS[c % len(CHANNEL_COLORS)], width=line_width)
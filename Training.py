@@ -0,0 +1,288 @@
+import os
+import json
+import pickle
+import hashlib
+import numpy as np
+import libemg
+from libemg.utils import get_windows
+from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
+from RecordingIO import load_recording, load_recordings, atomic_write
+
+WINDOW_SIZE = 30
+WINDOW_INCREMENT = 5
+FEATURES = ['WENG']
+CLASS_NAMES = ["Rest", "Close", "Open", "Pronation", "Supination"]
+MAJORITY_VOTE = 11
+CACHE_VERSION = 1
+
+# Training stages reported through the progress callbacks, with the text the UI shows for them.
+# Reading, windowing and featurizing happen together per recording, so they share one stage.
+STAGES = {
+    'load': "Loading recordings",
+    'features': "Windowing and extracting features",
+    'fit': "Fitting classifier",
+    'velocity': "Calibrating velocity",
+}
+
+def fingerprint(recordings, window_size=WINDOW_SIZE, window_increment=WINDOW_INCREMENT, feature_list=FEATURES,
+                class_names=CLASS_NAMES):
+    """Hash of everything a trained classifier depends on.
+
+    Covers the training configuration and, for every recording in training order, its
+    class, rep and the file's size and mtime - so adding, deleting or re-recording
+    anything produces a new fingerprint.
+    """
+    key = {
+        'version': CACHE_VERSION,
+        'window_size': window_size,
+        'window_increment': window_increment,
+        'features': list(feature_list),
+        'classes': list(class_names),
+        'majority_vote': MAJORITY_VOTE,
+        'recordings': [],
+    }
+    for entry in recordings:
+        stat = os.stat(entry['path'])
+        key['recordings'].append([entry['path'], entry['class'], entry['rep'], stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+
+def available_recordings(catalog, class_names=CLASS_NAMES):
+    """Returns the catalog's recordings of class_names whose files still exist.
+
+    A recording deleted from the folder by hand would otherwise fail every training, so
+    it is skipped and tombstoned in the catalog.
+    """
+    recordings = []
+    for entry in catalog.recordings(classes=class_names):
+        if os.path.exists(entry['path']):
+            recordings.append(entry)
+        else:
+            print(f"Removing {entry['path']} from the catalog: the file no longer exists")
+            catalog.remove(entry['path'])
+    return recordings
+
+def _config_key(window_size, window_increment, feature_list):
+    key = json.dumps([CACHE_VERSION, window_size, window_increment, list(feature_list)])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+class FeatureCache:
+    """Per-recording cache of extracted features for one (window size, increment, features) configuration.
+
+    Each recording's feature matrices and per-window velocity metric are stored in
+    <folder>/<config>_<path hash>.npz, stamped with the recording's size and mtime, so
+    only new or changed recordings are windowed and featurized again.
+    """
+    def __init__(self, folder, window_size=WINDOW_SIZE, window_increment=WINDOW_INCREMENT, feature_list=FEATURES):
+        self.folder = folder
+        self.window_size = window_size
+        self.window_increment = window_increment
+        self.feature_list = list(feature_list)
+        self.config = _config_key(window_size, window_increment, feature_list)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+    def cache_path(self, path):
+        key = hashlib.sha1(os.path.normpath(path).encode('utf-8')).hexdigest()
+        return os.path.join(self.folder, f"{self.config}_{key}.npz")
+
+    def get(self, path):
+        """Returns ({feature: windows x values}, velocity metric per window) for one recording."""
+        stat = os.stat(path)
+        cache_path = self.cache_path(path)
+        try:
+            with np.load(cache_path) as cached:
+                if cached['mtime'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                    return {f: cached['feature_' + f] for f in self.feature_list}, cached['velocity']
+        except (OSError, KeyError, ValueError):
+            pass
+
+        features, velocity = self.extract(path)
+        atomic_write(cache_path, lambda f: np.savez(f, velocity=velocity, mtime=stat.st_mtime_ns, size=stat.st_size,
+                                                    **{'feature_' + name: values for name, values in features.items()}))
+        return features, velocity
+
+    def extract(self, path):
+        data = np.asarray(load_recording(path, mmap=False), dtype=np.float64)
+        windows = get_windows(data, self.window_size, self.window_increment) if data.shape[0] >= self.window_size else \
+            np.empty((0, data.shape[1], self.window_size))
+        if windows.shape[0] == 0:
+            return {f: np.empty((0, 0)) for f in self.feature_list}, np.empty(0)
+        features = libemg.feature_extractor.FeatureExtractor().extract_features(self.feature_list, windows)
+        # The metric libemg's add_velocity derives its thresholds from
+        velocity = np.sum(np.mean(np.abs(windows), 2), axis=1)
+        return features, velocity
+
+    def prune(self, paths):
+        """Deletes cached features of this configuration for recordings no longer in `paths`."""
+        keep = set(os.path.basename(self.cache_path(p)) for p in paths)
+        for filename in os.listdir(self.folder):
+            if filename.startswith(self.config + '_') and filename.endswith('.npz') and filename not in keep:
+                os.remove(os.path.join(self.folder, filename))
+
+class LDAStatistics:
+    """Sufficient statistics for LDA, kept per recording so the model can be updated incrementally.
+
+    Each recording contributes its window count, feature mean and centred scatter
+    matrix. Recordings are folded in or dropped individually and the per-class totals
+    are recombined from the stored statistics, so old data is never revisited. fit()
+    builds a LinearDiscriminantAnalysis equivalent to sklearn's default (svd) solver
+    fitted on all the windows.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.recordings = {}
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    self.recordings = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError) as e:
+                print("Ignoring unreadable LDA statistics:", e)
+
+    def is_current(self, key, stamp):
+        return key in self.recordings and self.recordings[key]['stamp'] == stamp
+
+    def add(self, key, gesture, features, stamp=None):
+        """Folds in (or replaces) one recording's (windows x features) matrix."""
+        features = np.asarray(features, dtype=np.float64)
+        mean = features.mean(axis=0)
+        centred = features - mean
+        self.recordings[key] = {'class': gesture, 'stamp': stamp, 'n': features.shape[0],
+                                'mean': mean, 'scatter': centred.T @ centred}
+
+    def remove(self, key):
+        self.recordings.pop(key, None)
+
+    def save(self):
+        atomic_write(self.path, lambda f: pickle.dump(self.recordings, f))
+
+    def class_statistics(self, class_names):
+        """Combines the recordings of every class into (label, n, mean, scatter), in label order."""
+        stats = []
+        for label, gesture in enumerate(class_names):
+            parts = [r for r in self.recordings.values() if r['class'] == gesture and r['n'] > 0]
+            if not parts:
+                continue
+            n = sum(r['n'] for r in parts)
+            mean = sum(r['n'] * r['mean'] for r in parts) / n
+            scatter = sum(r['scatter'] + r['n'] * np.outer(r['mean'] - mean, r['mean'] - mean) for r in parts)
+            stats.append((label, n, mean, scatter))
+        return stats
+
+    def fit(self, class_names):
+        stats = self.class_statistics(class_names)
+        if len(stats) < 2:
+            raise ValueError("LDA needs recordings of at least two classes")
+        labels = np.array([s[0] for s in stats])
+        counts = np.array([s[1] for s in stats], dtype=np.float64)
+        means = np.array([s[2] for s in stats])
+        n = counts.sum()
+
+        # Pooled within-class covariance, normalised by the window count as sklearn's svd solver does
+        covariance = sum(s[3] for s in stats) / n
+        priors = counts / n
+        xbar = priors @ means
+        centred_means = means - xbar
+        coef = np.linalg.lstsq(covariance, centred_means.T, rcond=None)[0].T
+        intercept = -0.5 * np.sum(coef * centred_means, axis=1) + np.log(priors) - coef @ xbar
+
+        lda = LinearDiscriminantAnalysis()
+        lda.classes_ = labels
+        lda.priors_ = priors
+        lda.means_ = means
+        lda.xbar_ = xbar
+        lda.n_features_in_ = means.shape[1]
+        if len(labels) == 2:
+            # sklearn keeps a single decision function for binary problems
+            lda.coef_ = (coef[1] - coef[0])[None, :]
+            lda.intercept_ = np.array([intercept[1] - intercept[0]])
+        else:
+            lda.coef_ = coef
+            lda.intercept_ = intercept
+        return lda
+
+def train_classifier(recordings, class_names=CLASS_NAMES, window_size=WINDOW_SIZE, window_increment=WINDOW_INCREMENT,
+                     feature_list=FEATURES, cache_folder=None, progress=None):
+    """Fits the offline classifier. Returns a dict with the classifier, training features and labels.
+
+    Per-recording features come from a FeatureCache in cache_folder (Data/.cache/features
+    by default), so only recordings that are new or changed since the last training are featurized.
+    progress, if given, is called as progress(stage, done, total) with the stages in STAGES.
+    """
+    progress = progress or (lambda stage, done, total: None)
+    recordings = list(recordings)
+    if not recordings:
+        raise ValueError(f"No recordings of {', '.join(class_names)} to train on - record some gestures first")
+    if cache_folder is None:
+        cache_folder = os.path.join('Data', '.cache', 'features')
+    cache = FeatureCache(cache_folder, window_size, window_increment, feature_list)
+
+    # Steps 1-2: Window each recording and extract its features (in parallel, cached per file)
+    results = [None] * len(recordings)
+    progress('features', 0, len(recordings))
+    for done, (i, path, result) in enumerate(load_recordings([e['path'] for e in recordings], cache.get), 1):
+        results[i] = result
+        progress('features', done, len(recordings))
+    cache.prune([e['path'] for e in recordings])
+
+    # Assembled in catalog order, matching OfflineDataHandler.parse_windows
+    kept = [(e, r) for e, r in zip(recordings, results) if r[1].shape[0] > 0]
+    if not kept:
+        raise ValueError(f"Every recording is shorter than one {window_size} sample window")
+    training_features = {f: np.vstack([r[0][f] for e, r in kept]) for f in feature_list}
+    labels = np.concatenate([np.full(r[1].shape[0], class_names.index(e['class'])) for e, r in kept])
+    velocity = np.concatenate([r[1] for e, r in kept])
+
+    # Step 3: Update the LDA statistics with recordings added or changed since the last training
+    progress('fit', 0, 1)
+    lda_statistics = LDAStatistics(os.path.join(cache_folder, f"lda_{cache.config}.pkl"))
+    for e, (features, metric) in zip(recordings, results):
+        stat = os.stat(e['path'])
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if not lda_statistics.is_current(e['path'], stamp) and metric.shape[0] > 0:
+            lda_statistics.add(e['path'], e['class'], np.hstack([features[f] for f in feature_list]), stamp)
+    for path in set(lda_statistics.recordings) - set(e['path'] for e in recordings):
+        lda_statistics.remove(path)
+    lda_statistics.save()
+
+    # Step 4: Create the EMG Classifier from the statistics (equivalent to fitting LDA on every window)
+    o_classifier = libemg.emg_predictor.EMGClassifier(model=lda_statistics.fit(class_names))
+    o_classifier.add_majority_vote(MAJORITY_VOTE)
+    progress('velocity', 0, 1)
+    # add_velocity only needs sum(mean(|window|)) per window, so the cached metric is passed in
+    # as one-sample windows, which reduce to exactly that value
+    o_classifier.add_velocity(velocity[:, None, None], labels)
+    return {'classifier': o_classifier, 'training_features': training_features, 'labels': labels}
+
+def load_or_train(catalog, class_names=CLASS_NAMES, window_size=WINDOW_SIZE, window_increment=WINDOW_INCREMENT,
+                  feature_list=FEATURES, progress=None):
+    """Returns the trained model for the current recordings, from disk when nothing has changed.
+
+    Models are pickled to <catalog folder>/.cache/classifiers/<fingerprint>.pkl; only the
+    latest one is kept. The returned dict also carries the recordings' 'fingerprint', so
+    callers can tell whether two models are the same.
+    """
+    progress = progress or (lambda stage, done, total: None)
+    progress('load', 0, 1)
+    recordings = available_recordings(catalog, class_names)
+    key = fingerprint(recordings, window_size, window_increment, feature_list, class_names)
+    folder = os.path.join(catalog.folder, '.cache', 'classifiers')
+    path = os.path.join(folder, key + '.pkl')
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                model = pickle.load(f)
+            model['fingerprint'] = key
+            return model
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            print("Ignoring unreadable classifier cache:", e)
+
+    model = train_classifier(recordings, class_names, window_size, window_increment, feature_list,
+                             os.path.join(catalog.folder, '.cache', 'features'), progress)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    atomic_write(path, lambda f: pickle.dump(model, f))
+    for filename in os.listdir(folder):
+        if filename.endswith('.pkl') and filename != key + '.pkl':
+            os.remove(os.path.join(folder, filename))
+    model['fingerprint'] = key
+    return model